@@ -0,0 +1,299 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .file import H5File
+from .utils import _default_block_rows
+
+
+class AsyncH5File(object):
+    """An asyncio interface to an `H5File`.
+
+    All operations on the file run, one at a time, on an executor thread
+    dedicated to the file, so they don't block the event loop and the
+    PyTables handle is only ever used from a single thread.
+
+    Nodes are returned as `AsyncH5Group` and `AsyncH5TableNode` objects,
+    which refer to their node by path and run their operations on the same
+    thread. Use `run` for anything not covered by these classes.
+
+    The table nodes made by `create_table` are kept for the operations of
+    `AsyncH5TableNode`, so their `buffer_rows` and `flush_interval` settings
+    apply to all the appends to the table.
+
+    Parameters
+    ----------
+    filename : str
+        HDF5 file name.
+    mode : str
+        Mode to open the file; see `H5File`.
+    kwargs : key/value pairs
+        Keyword args passed to `H5File`.
+    """
+
+    def __init__(self, filename, mode="r+", **kwargs):
+        self.filename = filename
+        self.mode = mode
+        self._kwargs = kwargs
+        self._h5 = None
+        self._executor = None
+
+        # The H5TableNode objects made by `create_table`, keyed by node path.
+        # Only used on the executor thread.
+        self._table_nodes = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # --------------------------------------------------------------------------
+    #  Public interface
+    # --------------------------------------------------------------------------
+
+    @property
+    def is_open(self):
+        return self._h5 is not None
+
+    async def open(self):
+        """ Open the file on the executor thread of the file. """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="AsyncH5File"
+            )
+        if self._h5 is None:
+            self._h5 = await self._call(
+                H5File, self.filename, mode=self.mode, **self._kwargs
+            )
+
+    async def close(self):
+        """ Close the file and stop its executor thread. """
+        if self._h5 is not None:
+            await self._call(self._h5.close)
+            self._h5 = None
+            self._table_nodes.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def run(self, func, *args, **kwargs):
+        """Run `func(h5, *args, **kwargs)` on the executor thread of the file,
+        where `h5` is the `H5File`, and return its result.
+
+        The result must not hold PyTables objects which are used after the
+        call, since those may only be used on the executor thread.
+        """
+        if self._h5 is None:
+            raise ValueError("The file is not open.")
+        return await self._call(func, self._h5, *args, **kwargs)
+
+    async def contains(self, node_path):
+        return await self.run(H5File.__contains__, node_path)
+
+    async def read(self, node_path, key=None):
+        """ Read data from an array node. See `H5File.read`. """
+        return await self.run(H5File.read, node_path, key=key)
+
+    async def iter_chunks(self, node_path, chunk_rows=None):
+        """Iterate asynchronously over blocks of rows of an array node.
+
+        Parameters
+        ----------
+        node_path : str
+            PyTable node path; e.g. '/path/to/node'.
+        chunk_rows : int
+            Number of rows in a block. Defaults to a multiple of the chunk
+            length of the array.
+        """
+        make_iterator = partial(_iter_array_rows, chunk_rows=chunk_rows)
+        async for block in self._iterate(make_iterator, node_path):
+            yield block
+
+    async def create_array(self, node_path, array_or_shape, **kwargs):
+        """Create node to store an array. See `H5File.create_array`.
+
+        Unlike `H5File.create_array`, nothing is returned.
+        """
+        await self.run(
+            _discard_result(H5File.create_array),
+            node_path,
+            array_or_shape,
+            **kwargs
+        )
+
+    async def create_group(self, group_path, **kwargs):
+        """ Create group. See `H5File.create_group`. """
+        await self.run(
+            _discard_result(H5File.create_group), group_path, **kwargs
+        )
+        return AsyncH5Group(self, group_path)
+
+    async def create_table(self, node_path, description, **kwargs):
+        """ Create table node. See `H5File.create_table`. """
+        await self.run(self._create_table, node_path, description, **kwargs)
+        return AsyncH5TableNode(self, node_path)
+
+    async def remove_node(self, node_path):
+        await self.run(H5File.remove_node, node_path)
+
+    async def remove_group(self, group_path, **kwargs):
+        await self.run(H5File.remove_group, group_path, **kwargs)
+
+    def group(self, group_path):
+        """ Return an `AsyncH5Group` for the group at the given path. """
+        return AsyncH5Group(self, group_path)
+
+    def table(self, node_path):
+        """ Return an `AsyncH5TableNode` for the table at the given path. """
+        return AsyncH5TableNode(self, node_path)
+
+    # --------------------------------------------------------------------------
+    #  Private interface
+    # --------------------------------------------------------------------------
+
+    def _create_table(self, h5, node_path, description, **kwargs):
+        node = h5.create_table(node_path, description, **kwargs)
+        self._table_nodes[node._h5_table._v_pathname] = node
+
+    def _table_node(self, h5, node_path):
+        """Return the table node at the given path, as made by `create_table`
+        if it was, so that its append buffer is used.
+        """
+        node = h5[node_path]
+        table_node = self._table_nodes.get(node._h5_table._v_pathname)
+        if table_node is not None and table_node._h5_table is node._h5_table:
+            return table_node
+        return node
+
+    async def _call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
+
+    async def _iterate(self, make_iterator, *args):
+        """Run an iterator on the executor thread and yield its items.
+
+        `make_iterator(h5, *args)` is called on the thread to create it.
+        """
+        iterator = await self.run(make_iterator, *args)
+        done = object()
+        while True:
+            item = await self._call(next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+
+class AsyncH5Group(object):
+    """ An asyncio interface to an `H5Group`. See `AsyncH5File`. """
+
+    def __init__(self, async_file, group_path):
+        self.async_file = async_file
+        self.pathname = group_path
+
+    async def read(self, node_subpath, key=None):
+        return await self.async_file.read(self._join(node_subpath), key=key)
+
+    async def iter_chunks(self, node_subpath, chunk_rows=None):
+        node_path = self._join(node_subpath)
+        async for block in self.async_file.iter_chunks(node_path, chunk_rows):
+            yield block
+
+    async def create_array(self, node_subpath, array_or_shape, **kwargs):
+        await self.async_file.create_array(
+            self._join(node_subpath), array_or_shape, **kwargs
+        )
+
+    async def create_group(self, group_subpath, **kwargs):
+        return await self.async_file.create_group(
+            self._join(group_subpath), **kwargs
+        )
+
+    async def create_table(self, node_subpath, description, **kwargs):
+        return await self.async_file.create_table(
+            self._join(node_subpath), description, **kwargs
+        )
+
+    async def children_names(self):
+        return await self.async_file.run(
+            lambda h5: h5[self.pathname].children_names
+        )
+
+    def _join(self, node_subpath):
+        return H5File.join_path(self.pathname, node_subpath)
+
+
+class AsyncH5TableNode(object):
+    """ An asyncio interface to an `H5TableNode`. See `AsyncH5File`. """
+
+    def __init__(self, async_file, node_path):
+        self.async_file = async_file
+        self.pathname = node_path
+
+    async def append(self, data):
+        """ Add some data to the table. See `H5TableNode.append`. """
+        await self._run_method("append", data)
+
+    async def flush(self):
+        await self._run_method("flush")
+
+    async def size(self):
+        """ Return the number of rows of the table. """
+        return await self._run_method("__len__")
+
+    async def read(self, columns=None, start=None, stop=None, step=None):
+        """ Read rows of the table. See `H5TableNode.read`. """
+        return await self._run_method("read", columns, start, stop, step)
+
+    async def where(self, condition, columns=None, **kwargs):
+        """ Read the rows matching a condition. See `H5TableNode.where`. """
+        return await self._run_method("where", condition, columns, **kwargs)
+
+    async def iter_chunks(self, columns=None, chunk_rows=None):
+        """Iterate asynchronously over blocks of rows of the table. See
+        `H5TableNode.iter_chunks`.
+        """
+        def make_iterator(h5):
+            node = self.async_file._table_node(h5, self.pathname)
+            return node.iter_chunks(columns, chunk_rows)
+
+        async for block in self.async_file._iterate(make_iterator):
+            yield block
+
+    async def _run_method(self, name, *args, **kwargs):
+        def call(h5):
+            node = self.async_file._table_node(h5, self.pathname)
+            return getattr(node, name)(*args, **kwargs)
+
+        return await self.async_file.run(call)
+
+
+def _discard_result(func):
+    """ Wrap a function so that it returns None. """
+    def wrapper(*args, **kwargs):
+        func(*args, **kwargs)
+
+    return wrapper
+
+
+def _iter_array_rows(h5, node_path, chunk_rows=None):
+    node = h5._h5.get_node(node_path)
+    if chunk_rows is None:
+        chunk_rows = _default_block_rows(node)
+    # Rows are along the main dimension, as for `map_chunks`.
+    maindim = node.maindim
+    for start in range(0, node.shape[maindim], chunk_rows):
+        key = (slice(None),) * maindim + (slice(start, start + chunk_rows),)
+        yield node[key]
@@ -7,12 +7,16 @@
 # is also available online at http://www.enthought.com/licenses/BSD.txt
 #
 # Thanks for using Enthought open source!
-from contextlib import closing
+from contextlib import closing, contextmanager
+from functools import partial
+import io
 import json
+import pickle
+import warnings
 
-from numpy import ndarray
+from numpy import frombuffer, generic, ndarray, uint8
 
-from tables import Group as PyTablesGroup
+from tables import Filters, Group as PyTablesGroup, NaturalNameWarning
 from tables.nodes import filenode
 
 
@@ -20,6 +24,116 @@ from tables.nodes import filenode
 ARRAY_PROXY_KEY = "__array__"
 NODE_KEY = "node_name"
 
+#: Separator of the keys and list indices which make up the node name of an
+#: array nested inside a value, e.g. 'key.0.subkey'.
+NESTED_NAME_SEPARATOR = "."
+
+#: Attribute marking the data node of a dict stored in the binary format.
+BINARY_FORMAT_ATTR = "BINARY_PYOBJECT_DATA"
+
+#: Pickle protocol of the binary format. Fixed so files stay readable.
+BINARY_PROTOCOL = 4
+
+
+#: Types which can't contain arrays, and so are serialized as they are.
+_ATOMIC_TYPES = (str, int, float, bool, type(None))
+
+
+class _ArrayRef(object):
+    """ Reference to an array node in dict data in the binary format. """
+
+    __slots__ = ("node_name",)
+
+    def __init__(self, node_name):
+        self.node_name = node_name
+
+
+class _MetadataPickler(pickle.Pickler):
+    """A pickler which only accepts builtin container and scalar types and
+    `_ArrayRef`, so that the result can be loaded by `_MetadataUnpickler`.
+    """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, _ArrayRef):
+            return _ArrayRef, (obj.node_name,)
+        if obj is _ArrayRef:
+            # Pickle the class by reference, as usual.
+            return NotImplemented
+        msg = "Object of type {} is not supported in H5DictNode data"
+        raise TypeError(msg.format(type(obj).__name__))
+
+
+class _MetadataUnpickler(pickle.Unpickler):
+    """An unpickler which refuses to load any classes or functions, and
+    loads array references with the given `load_array(node_name)` function.
+    """
+
+    def __init__(self, file, load_array):
+        super().__init__(file)
+        self._load_array = load_array
+
+    def find_class(self, module, name):
+        if module == _ArrayRef.__module__ and name == _ArrayRef.__name__:
+            return self._load_array
+        msg = "Global '{}.{}' is not allowed in H5DictNode data"
+        raise pickle.UnpicklingError(msg.format(module, name))
+
+
+class ArrayProxy(object):
+    """A lazily loaded array value of an `H5DictNode`.
+
+    Indexing or slicing the proxy only reads the selected data from disk.
+    Converting it to an array, e.g. with `numpy.asarray` or `read()`, reads
+    the whole array and caches it.
+
+    Parameters
+    ----------
+    pyt_node : tables.Array
+        The PyTables node where the array is stored.
+    """
+
+    def __init__(self, pyt_node):
+        self._pyt_node = pyt_node
+        self._array = None
+
+    @property
+    def shape(self):
+        return self._pyt_node.shape
+
+    @property
+    def dtype(self):
+        return self._pyt_node.dtype
+
+    @property
+    def ndim(self):
+        return len(self._pyt_node.shape)
+
+    def read(self):
+        """ Return the whole array, reading it from disk on first access. """
+        if self._array is None:
+            self._array = self._pyt_node.read()
+        return self._array
+
+    def __getitem__(self, key):
+        if self._array is not None:
+            return self._array[key]
+        return self._pyt_node[key]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.read()
+        return array if dtype is None else array.astype(dtype)
+
+    def __repr__(self):
+        return "{}({!r}, shape={}, dtype={})".format(
+            type(self).__name__,
+            self._pyt_node._v_pathname,
+            self.shape,
+            self.dtype,
+        )
+
 
 class H5DictNode(object):
     """Dictionary-like node interface.
@@ -29,7 +143,9 @@ class H5DictNode(object):
     different data types.
 
     Note that this is implemented using a group-node assuming that arrays are
-    valid inputs and will be stored as H5 array nodes.
+    valid inputs and will be stored as H5 array nodes. Arrays nested inside
+    lists and dicts are stored in nodes named after their path, e.g. the
+    array in `{'a': [1, array]}` is stored in node 'a.1'.
 
     Parameters
     ----------
@@ -38,24 +154,61 @@ class H5DictNode(object):
     auto_flush : bool
         If True, write data to disk whenever the dict data is altered.
         Otherwise, call `flush()` explicitly to write data to disk.
+    lazy : bool
+        If True, array values are returned as `ArrayProxy` objects which read
+        from disk when accessed. Otherwise, all arrays are read when the node
+        is opened.
+    binary_metadata : bool
+        If True, store the dict data in a compact binary format (a restricted
+        pickle in a uint8 array) which is faster to read and write than JSON.
+        Tuples are stored as lists, like in JSON, but non-string keys are
+        kept. By default, the existing format of the node is kept.
+
+    Numpy scalars (e.g. `array[0]`) are stored as the equivalent Python
+    scalars in both formats.
+
+    Only the arrays which were set since the last flush are written to disk,
+    so an array which is modified in place must be set again (e.g.
+    `node[key] = node[key]`) for the change to be saved.
     """
 
     #: Name of filenode where dict data is stored.
     _pyobject_data_node = "_pyobject_data"
 
-    def __init__(self, h5_group, auto_flush=True):
+    def __init__(
+        self, h5_group, auto_flush=True, lazy=False, binary_metadata=None
+    ):
         assert self.is_dict_node(h5_group)
 
         h5_group = self._get_pyt_group(h5_group)
         self._h5_group = h5_group
         self.auto_flush = auto_flush
+        self.lazy = lazy
+
+        # The array values as last written to disk, keyed by node name, and
+        # the keys which were set or deleted since then.
+        self._stored_arrays = {}
+        self._dirty_keys = set()
+
+        # Number of nested `batch()` contexts; auto flushes wait until zero.
+        self._batch_depth = 0
 
         # Load dict data from the file node.
         dict_node = getattr(h5_group, self._pyobject_data_node)
-        with closing(filenode.open_node(dict_node)) as f:
-            self._pyobject_data = json.loads(
-                f.read().decode("ascii"), object_hook=self._object_hook
-            )
+        is_binary = BINARY_FORMAT_ATTR in dict_node._v_attrs
+        if is_binary:
+            f = io.BytesIO(dict_node.read())
+            unpickler = _MetadataUnpickler(f, self._load_array)
+            self._pyobject_data = unpickler.load()
+        else:
+            with closing(filenode.open_node(dict_node)) as f:
+                self._pyobject_data = json.loads(
+                    f.read().decode("ascii"), object_hook=self._object_hook
+                )
+
+        if binary_metadata is None:
+            binary_metadata = is_binary
+        self.binary_metadata = binary_metadata
 
     # --------------------------------------------------------------------------
     #  Dictionary interface
@@ -66,13 +219,13 @@ class H5DictNode(object):
 
     def __setitem__(self, key, value):
         self.data[key] = value
-        if self.auto_flush:
-            self.flush()
+        self._dirty_keys.add(key)
+        self._auto_flush()
 
     def __delitem__(self, key):
         del self.data[key]
-        if self.auto_flush:
-            self.flush()
+        self._dirty_keys.add(key)
+        self._auto_flush()
 
     def __contains__(self, key):
         return key in self.data
@@ -80,6 +233,16 @@ class H5DictNode(object):
     def keys(self):
         return self.data.keys()
 
+    def update(self, *args, **kwargs):
+        """Update the dict from a mapping or iterable of key/value pairs
+        and/or keyword arguments, like `dict.update`.
+
+        With `auto_flush`, the data is written to disk once at the end.
+        """
+        with self.batch():
+            for key, value in dict(*args, **kwargs).items():
+                self[key] = value
+
     # --------------------------------------------------------------------------
     #  Public interface
     # --------------------------------------------------------------------------
@@ -91,13 +254,35 @@ class H5DictNode(object):
     @data.setter
     def data(self, new_data_dict):
         self._pyobject_data = new_data_dict
-        if self.auto_flush:
-            self.flush()
+        self._auto_flush()
+
+    @contextmanager
+    def batch(self):
+        """Context manager which groups changes into a single flush.
+
+        With `auto_flush`, changes made inside the context are written to
+        disk once when the outermost `batch` context exits, instead of after
+        every change.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self._auto_flush()
 
     def flush(self):
-        """ Write buffered data to disk. """
+        """Write buffered data to disk.
+
+        Array nodes are only rewritten if their value was changed since the
+        last flush.
+        """
+        out_data = self._update_array_nodes()
+        # Serialize first, so the old data is kept if that fails.
+        payload = self._serialize(out_data, self.binary_metadata)
         self._remove_pyobject_node()
-        self._write_pyobject_node()
+        self._write_pyobject_node(payload)
+        self._dirty_keys.clear()
 
     @classmethod
     def add_to_h5file(cls, h5, node_path, data=None, **kwargs):
@@ -111,13 +296,40 @@ class H5DictNode(object):
             Path to node where data is stored (e.g. '/path/to/my_dict')
         data : dict
             Data for initialization, if desired.
+        filters : tables.Filters
+            If given, array values are stored as chunked arrays compressed
+            with these filters. They are saved with the node, so they also
+            apply to arrays added later.
+        kwargs : key/value pairs
+            Keyword args passed to `H5DictNode`.
         """
-        h5.create_group(node_path)
+        filters = kwargs.pop("filters", None)
+        if filters is None:
+            h5.create_group(node_path)
+        else:
+            h5.create_group(node_path, filters=filters)
         group = h5[node_path]
 
-        cls._create_pyobject_node(h5._h5, node_path, data=data)
+        binary = kwargs.get("binary_metadata", False)
+        cls._create_pyobject_node(h5._h5, node_path, data=data, binary=binary)
         return cls(group, **kwargs)
 
+    @classmethod
+    def from_h5file(cls, h5, node_path, **kwargs):
+        """Open an existing dict node in an H5 file.
+
+        Unlike `h5[node_path]`, this accepts the keyword arguments of
+        `H5DictNode`, e.g. to open the node with `lazy=True`.
+
+        Parameters
+        ----------
+        h5 : H5File
+            The H5 file where the dictionary data is stored.
+        node_path : str
+            Path to node where data is stored (e.g. '/path/to/my_dict')
+        """
+        return cls(h5._h5.get_node(node_path), **kwargs)
+
     @classmethod
     def is_dict_node(cls, pytables_node):
         """Return True if PyTables node looks like an H5DictNode.
@@ -153,37 +365,153 @@ class H5DictNode(object):
         # Remove the group node
         self._h5_group._f_remove()
 
+    def _auto_flush(self):
+        """ Flush if `auto_flush` is on, unless inside a `batch` context. """
+        if self.auto_flush and self._batch_depth == 0:
+            self.flush()
+
     def _object_hook(self, dct):
         """This gets passed object dictionaries by `json.load(s)` and if it
         finds `ARRAY_PROXY_KEY` in the object description it returns the
         proxied array object.
         """
         if ARRAY_PROXY_KEY in dct:
-            node_name = dct[NODE_KEY]
-            return getattr(self._h5_group, node_name)[:]
+            return self._load_array(dct[NODE_KEY])
         return dct
 
+    def _load_array(self, node_name):
+        """ Return the array (or its proxy) stored in the given node. """
+        pyt_node = getattr(self._h5_group, node_name)
+        if self.lazy:
+            array = ArrayProxy(pyt_node)
+        else:
+            array = pyt_node[:]
+        self._stored_arrays[node_name] = array
+        return array
+
     def _remove_pyobject_node(self):
         node = getattr(self._h5_group, self._pyobject_data_node)
         node._f_remove()
 
-    def _write_pyobject_node(self):
+    def _write_pyobject_node(self, payload):
+        self._write_data_node(
+            self._h5_group._v_file,
+            self._h5_group._v_pathname,
+            payload,
+            self.binary_metadata,
+        )
+
+    def _update_array_nodes(self):
+        """Write the changed array values to their nodes and remove the nodes
+        of arrays which are no longer in the data.
+
+        Return a dictionary which is appropriate for JSON serialization.
+        """
         pyt_file = self._h5_group._v_file
-        node_path = self._h5_group._v_pathname
-        self._create_pyobject_node(pyt_file, node_path, self.data)
+        group = self._h5_group
+        stored = self._stored_arrays
+
+        # Find the arrays to write before writing any, since a proxy may
+        # refer to a node which is about to be replaced.
+        used_names = set()
+        to_write = []
+        make_proxy = self._proxy_factory(self.binary_metadata)
+
+        def on_array(name, value, dirty):
+            name = _unique_name(name, used_names)
+            if dirty or stored.get(name) is not value:
+                to_write.append((name, value))
+            return make_proxy(name)
+
+        out_data = {}
+        for key, value in list(self.data.items()):
+            dirty = key in self._dirty_keys
+            if dirty:
+                # Proxies which are set again may be shared with other keys,
+                # so their data is kept rather than the proxies themselves.
+                value = self.data[key] = _read_proxies(value)
+            out_data[key] = _encode_arrays(
+                value, [key], partial(on_array, dirty=dirty)
+            )
+
+        arrays = [
+            v.read() if isinstance(v, ArrayProxy) else v for _, v in to_write
+        ]
+        for (name, value), array in zip(to_write, arrays):
+            self._create_array_node(pyt_file, group, name, array)
+            stored[name] = value
+
+        # Remove nodes of arrays which were deleted or replaced.
+        removed = False
+        for name in list(group._v_children.keys()):
+            if name != self._pyobject_data_node and name not in used_names:
+                pyt_file.remove_node(group, name)
+                stored.pop(name, None)
+                removed = True
+
+        if to_write or removed:
+            self._invalidate_file_caches(pyt_file, group._v_pathname)
+        return out_data
 
     @classmethod
-    def _create_pyobject_node(cls, pyt_file, node_path, data=None):
+    def _create_pyobject_node(
+        cls, pyt_file, node_path, data=None, binary=False
+    ):
         if data is None:
             data = {}
 
         # Stash the array values in their own h5 nodes and return a dictionary
-        # which is appropriate for JSON serialization.
-        out_data = cls._handle_array_values(pyt_file, node_path, data)
+        # which is appropriate for serialization.
+        group = pyt_file.get_node(node_path)
+        used_names = set()
+        make_proxy = cls._proxy_factory(binary)
+
+        def on_array(name, value):
+            name = _unique_name(name, used_names)
+            cls._create_array_node(pyt_file, group, name, value)
+            return make_proxy(name)
+
+        out_data = {
+            key: _encode_arrays(value, [key], on_array)
+            for key, value in data.items()
+        }
+        payload = cls._serialize(out_data, binary)
+        cls._write_data_node(pyt_file, node_path, payload, binary)
+        cls._invalidate_file_caches(pyt_file, node_path)
+
+    @classmethod
+    def _serialize(cls, out_data, binary):
+        """ Return the dict data as bytes in the JSON or binary format. """
+        if binary:
+            f = io.BytesIO()
+            _MetadataPickler(f, protocol=BINARY_PROTOCOL).dump(out_data)
+            return f.getvalue()
+        return json.dumps(out_data).encode("ascii")
+
+    @classmethod
+    def _write_data_node(cls, pyt_file, node_path, payload, binary):
+        """ Write the serialized dict data to the data node. """
+        if binary:
+            node = pyt_file.create_array(
+                node_path,
+                cls._pyobject_data_node,
+                frombuffer(payload, dtype=uint8),
+            )
+            node._v_attrs[BINARY_FORMAT_ATTR] = True
+        else:
+            kwargs = dict(where=node_path, name=cls._pyobject_data_node)
+            with closing(filenode.new_node(pyt_file, **kwargs)) as f:
+                f.write(payload)
+
+    @classmethod
+    def _invalidate_file_caches(cls, pyt_file, node_path):
+        """Tell H5File that array nodes of the dict were created or removed.
+        """
+        # Import here to prevent circular imports
+        from .file import _invalidate_path_index, _invalidate_read_cache
 
-        kwargs = dict(where=node_path, name=cls._pyobject_data_node)
-        with closing(filenode.new_node(pyt_file, **kwargs)) as f:
-            f.write(json.dumps(out_data).encode("ascii"))
+        _invalidate_path_index(pyt_file)
+        _invalidate_read_cache(pyt_file, node_path)
 
     @classmethod
     def _get_pyt_group(self, group):
@@ -192,42 +520,103 @@ class H5DictNode(object):
         return group
 
     @classmethod
-    def _array_proxy(cls, pyt_file, group, key, array):
-        """Stores an array as a normal H5 node and returns the proxy object
-        which will be serialized to JSON.
+    def _create_array_node(cls, pyt_file, group, name, array):
+        """Stores an array as a normal H5 node, replacing any existing node
+        with the same name, and returns the new node.
+        """
+        if name in group:
+            pyt_file.remove_node(group, name)
+
+        # Only non-empty arrays with at least one dimension can be chunked.
+        chunked = group._v_filters != Filters() and array.size > 0
+        chunked = chunked and array.ndim > 0
+        with warnings.catch_warnings():
+            # Names are derived from the keys, so they need not be valid
+            # Python identifiers.
+            warnings.simplefilter("ignore", NaturalNameWarning)
+            if chunked:
+                # Compressed with the filters of the group.
+                return pyt_file.create_carray(group, name, obj=array)
+            return pyt_file.create_array(group, name, array)
+
+    @classmethod
+    def _proxy_factory(cls, binary):
+        """ Return the function creating array proxies for the format. """
+        return _ArrayRef if binary else cls._proxy_object
+
+    @classmethod
+    def _proxy_object(cls, name):
+        """Return the proxy object which replaces the array stored in node
+        `name` when the dict data is serialized.
 
         `ARRAY_PROXY_KEY` marks the object dictionary as an array proxy so that
         `_object_hook` can recognize it. `NODE_KEY` stores the node name of the
         array so that `_object_hook` can load the array data when the dict node
         is deserialized.
-
         """
-        if key in group:
-            pyt_file.remove_node(group, key)
-        pyt_file.create_array(group, key, array)
-        return {ARRAY_PROXY_KEY: True, NODE_KEY: key}
+        return {ARRAY_PROXY_KEY: True, NODE_KEY: name}
 
-    @classmethod
-    def _handle_array_values(cls, pyt_file, group_path, data):
-        group = pyt_file.get_node(group_path)
 
-        # Convert numpy array values to H5 array nodes.
-        out_data = {}
-        for key in data.keys():
-            value = data[key]
-            if isinstance(value, ndarray):
-                out_data[key] = cls._array_proxy(pyt_file, group, key, value)
-            else:
-                out_data[key] = value
-
-        # Remove stored arrays which are no longer in the data dictionary.
-        pyt_children = group._v_children
-        nodes_to_remove = []
-        for key in pyt_children.keys():
-            if key not in data:
-                nodes_to_remove.append(key)
-
-        for key in nodes_to_remove:
-            pyt_file.remove_node(group, key)
+def _encode_arrays(value, path, on_array):
+    """Return a copy of `value` with arrays replaced by proxy objects and
+    numpy scalars by Python scalars.
 
-        return out_data
+    Lists, tuples and dicts are searched recursively. `on_array(name, array)`
+    is called for each array found, with a node name made of the keys and
+    indices in `path` and those of the array within `value`, and returns its
+    proxy. `path` is used as a stack, so it is unchanged on return.
+    """
+    if isinstance(value, (ndarray, ArrayProxy)):
+        return on_array(NESTED_NAME_SEPARATOR.join(map(str, path)), value)
+    if isinstance(value, generic):
+        return value.item()
+    if isinstance(value, dict):
+        items = value.items()
+        encoded = {}
+    elif isinstance(value, (list, tuple)):
+        items = enumerate(value)
+        encoded = [None] * len(value)
+    else:
+        return value
+
+    for k, v in items:
+        if type(v) in _ATOMIC_TYPES:
+            encoded[k] = v
+        else:
+            path.append(k)
+            encoded[k] = _encode_arrays(v, path, on_array)
+            path.pop()
+    return encoded
+
+
+def _read_proxies(value):
+    """Return `value` with the `ArrayProxy` objects in it replaced by the
+    arrays they read.
+
+    Lists, tuples and dicts are searched recursively, and only copied if
+    they contain a proxy.
+    """
+    if isinstance(value, ArrayProxy):
+        return value.read()
+    if isinstance(value, dict):
+        read = {k: _read_proxies(v) for k, v in value.items()}
+        changed = any(read[k] is not v for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        read = [_read_proxies(v) for v in value]
+        changed = any(r is not v for r, v in zip(read, value))
+        if isinstance(value, tuple):
+            read = tuple(read)
+    else:
+        return value
+    return read if changed else value
+
+
+def _unique_name(name, used_names):
+    """ Return a variant of `name` not in `used_names`, and add it there. """
+    unique_name = name
+    i = 1
+    while unique_name in used_names:
+        unique_name = "{}_{}".format(name, i)
+        i += 1
+    used_names.add(unique_name)
+    return unique_name
@@ -7,15 +7,27 @@
 # is also available online at http://www.enthought.com/licenses/BSD.txt
 #
 # Thanks for using Enthought open source!
-from collections.abc import Mapping, MutableMapping
-from functools import partial
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping, MutableMapping
+import ctypes
+from fnmatch import fnmatchcase
+from functools import lru_cache, partial
 import inspect
+from itertools import chain, product
+from weakref import WeakKeyDictionary
 
 import numpy as np
 import tables
 
 from .dict_node import H5DictNode
-from .table_node import H5TableNode
+from .packed_node import H5PackedNode
+from .sparse_node import H5SparseNode
+from .table_node import (
+    _buffered_table_node,
+    _flush_buffered_nodes,
+    H5TableNode,
+)
+from .vlarray_node import H5VLArrayNode
 
 
 def get_atom(dtype):
@@ -23,10 +35,293 @@ def get_atom(dtype):
     return tables.Atom.from_dtype(np.dtype(dtype))
 
 
+#: Default target size of a chunk in bytes for `guess_chunkshape`.
+DEFAULT_CHUNK_BYTES = 2 ** 18
+
+
+def guess_chunkshape(
+    shape, dtype, access="rows", chunk_bytes=DEFAULT_CHUNK_BYTES
+):
+    """Return a chunkshape suited to the way an array will be read.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the array. A length of 0 along the first axis is taken to be
+        an extendable axis of unknown length.
+    dtype : str or numpy.dtype
+        Data type of the array.
+    access : {'rows', 'columns'}
+        The expected access pattern. For 'rows', chunks span whole rows
+        (e.g. `array[i:j]`), filling the last axes first. For 'columns',
+        chunks span as much of the first axis as possible, for reading slabs
+        such as `array[:, i:j]`.
+    chunk_bytes : int
+        Approximate size of a chunk in bytes.
+    """
+    if access == "rows":
+        axes = reversed(range(len(shape)))
+    elif access == "columns":
+        axes = range(len(shape))
+    else:
+        msg = "`access` must be 'rows' or 'columns', not {!r}."
+        raise ValueError(msg.format(access))
+
+    # Number of elements which fit in a chunk.
+    budget = max(1, chunk_bytes // np.dtype(dtype).itemsize)
+    chunkshape = [1] * len(shape)
+    for axis in axes:
+        length = shape[axis] if shape[axis] > 0 else budget
+        chunkshape[axis] = min(length, budget)
+        budget = max(1, budget // chunkshape[axis])
+    return tuple(chunkshape)
+
+
+#: The address HDF5 returns for datasets without contiguous storage.
+HADDR_UNDEF = 2 ** 64 - 1
+
+
+@lru_cache(maxsize=None)
+def _hdf5_library():
+    """Return the HDF5 library used by PyTables as a `ctypes.CDLL`, or None
+    if it cannot be loaded.
+    """
+    from tables import hdf5extension
+
+    try:
+        # Symbols of the library are found through the extension module
+        # which links to it.
+        return ctypes.CDLL(hdf5extension.__file__)
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _h5d_get_offset():
+    """Return the `H5Dget_offset` function of the HDF5 library used by
+    PyTables, or None if it cannot be found.
+    """
+    func = getattr(_hdf5_library(), "H5Dget_offset", None)
+    if func is not None:
+        func.argtypes = [ctypes.c_int64]
+        func.restype = ctypes.c_uint64
+    return func
+
+
+@lru_cache(maxsize=None)
+def hdf5_is_threadsafe():
+    """Return True if the HDF5 library used by PyTables was built to be
+    thread-safe, i.e. it serializes concurrent calls itself.
+    """
+    func = getattr(_hdf5_library(), "H5is_library_threadsafe", None)
+    if func is None:
+        return False
+    result = ctypes.c_bool()
+    if func(ctypes.byref(result)) < 0:
+        return False
+    return result.value
+
+
+def _get_dataset_offset(node):
+    """Return the file offset of the data of a contiguous, uncompressed
+    array node, or None if the data cannot be mapped.
+    """
+    if type(node) is not tables.Array or node.shape == ():
+        return None
+    if node._v_file.params.get("DRIVER") not in (None, "H5FD_SEC2"):
+        return None
+    get_offset = _h5d_get_offset()
+    if get_offset is None:
+        return None
+    offset = get_offset(node._v_objectid)
+    return None if offset == HADDR_UNDEF else offset
+
+
 def iterator_length(iterator):
     return sum(1 for _ in iterator)
 
 
+#: Path indexes of PyTables files, see `_get_path_index`.
+_path_indexes = WeakKeyDictionary()
+
+
+class _PathIndex(object):
+    """The layout of a PyTables file.
+
+    Only groups are loaded to build the index. The classes of leaves are
+    looked up when they are first needed.
+    """
+
+    def __init__(self, pyt_file):
+        #: Mapping of group path -> names of the children of the group.
+        self.children = {}
+
+        #: Mapping of node path -> class the node is wrapped in by H5File.
+        self.classes = {}
+
+        for group in pyt_file.walk_groups("/"):
+            group_path = group._v_pathname
+            self.children[group_path] = list(group._v_children.keys())
+            self.classes[group_path] = _node_class(group)
+
+    def is_group(self, node_path):
+        return node_path in self.children
+
+    def walk_groups(self, path):
+        """Iterate over the paths of a group and its descendant groups, in
+        the same order as `tables.File.walk_groups`.
+        """
+        yield path
+        stack = [path]
+        while stack:
+            group_path = stack.pop()
+            prefix = group_path.rstrip("/") + "/"
+            subgroups = [
+                prefix + name
+                for name in sorted(self.children[group_path])
+                if self.is_group(prefix + name)
+            ]
+            yield from subgroups
+            stack.extend(subgroups)
+
+    def node_class(self, pyt_file, node_path):
+        cls = self.classes.get(node_path)
+        if cls is None:
+            cls = _node_class(pyt_file.get_node(node_path))
+            self.classes[node_path] = cls
+        return cls
+
+
+def _get_path_index(pyt_file):
+    """Return the path index of a PyTables file, building it if necessary.
+
+    The index is shared by all `H5File` and `H5Group` objects of the file,
+    and discarded whenever they create or remove nodes.
+    """
+    index = _path_indexes.get(pyt_file)
+    if index is None:
+        index = _path_indexes[pyt_file] = _PathIndex(pyt_file)
+    return index
+
+
+def _invalidate_path_index(pyt_file):
+    """ Discard the path index of a PyTables file. """
+    _path_indexes.pop(pyt_file, None)
+
+
+#: Read caches of PyTables files, see `H5File.cache`.
+_read_caches = WeakKeyDictionary()
+
+#: Default filters of PyTables files, used for nodes created by `H5Group`.
+_default_filters = WeakKeyDictionary()
+
+
+class ArrayCache(object):
+    """A least recently used cache of array reads, limited in bytes.
+
+    Entries are keyed by node path and the key (index or slice) used to read
+    from the node. Cached arrays are made read-only, since they are handed
+    out to every reader of the same data.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Maximum total size of the cached arrays. Arrays larger than this are
+        never cached.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+
+        #: Number of reads which were, and weren't, served from the cache.
+        self.hits = 0
+        self.misses = 0
+
+        #: Total size of the cached arrays in bytes.
+        self.nbytes = 0
+
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def read(self, node, node_path, key):
+        """ Return `node[key]`, from the cache if possible. """
+        cache_key = _hashable_key(key)
+        if cache_key is None:
+            # Fancy indexing with arrays or lists isn't cached.
+            return node[key]
+        cache_key = (node_path, cache_key)
+
+        value = self._entries.get(cache_key)
+        if value is not None:
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = node[key]
+        nbytes = np.asarray(value).nbytes
+        if nbytes <= self.max_bytes:
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            self._entries[cache_key] = value
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= np.asarray(evicted).nbytes
+        return value
+
+    def invalidate(self, node_path):
+        """ Drop the entries of a node and of the nodes below it. """
+        prefix = node_path.rstrip("/") + "/"
+        for cache_key in list(self._entries):
+            path = cache_key[0]
+            if path == node_path or path.startswith(prefix):
+                value = self._entries.pop(cache_key)
+                self.nbytes -= np.asarray(value).nbytes
+
+    def clear(self):
+        """ Drop all entries, keeping the hit and miss counts. """
+        self._entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """ Return a dict of the cache statistics. """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _hashable_key(key):
+    """Return a hashable version of an index or slice key, or None if the key
+    selects items with arrays or lists.
+    """
+    if isinstance(key, tuple):
+        parts = [_hashable_key(part) for part in key]
+        return None if None in parts else tuple(parts)
+    if isinstance(key, slice):
+        return ("slice", key.start, key.stop, key.step)
+    if key is Ellipsis:
+        return ("ellipsis",)
+    if isinstance(key, (int, np.integer)):
+        return int(key)
+    return None
+
+
+def _invalidate_read_cache(pyt_file, node_path):
+    """ Drop the cached reads of a node and of the nodes below it. """
+    cache = _read_caches.get(pyt_file)
+    if cache is not None:
+        cache.invalidate(node_path)
+
+
 def _update_wrapped_docstring(wrapped, original=None):
     PREAMBLE = """\
 ** H5Group wrapper for H5File.{func_name}: **
@@ -73,6 +368,16 @@ class H5File(Mapping):
     chunked : bool
         If True, the default behavior of `create_array` will be a chunked
         array (see PyTables `create_carray`).
+    h5filters : tables.Filters
+        The default compression filters for chunked and extendable arrays,
+        also used for nodes created through the `H5Group` objects of the
+        file. By default, blosc compression (level 5, with shuffling) is
+        used.
+    cache_bytes : int
+        If given, reads through `read` are cached in an `ArrayCache` of this
+        size in bytes. The cache is shared with the `H5Group` nodes of the
+        file, and invalidated when nodes are created or removed through the
+        `H5File` API.
 
     """
 
@@ -89,15 +394,18 @@ class H5File(Mapping):
         auto_groups=True,
         auto_open=True,
         h5filters=None,
+        cache_bytes=None,
     ):
         self.mode = mode
         self.delete_existing = delete_existing
         self.auto_groups = auto_groups
         if h5filters is None:
-            self.h5filters = tables.Filters(
+            h5filters = tables.Filters(
                 complib="blosc", complevel=5, shuffle=True
             )
+        self.h5filters = h5filters
         self._h5 = None
+        self._cache = None if cache_bytes is None else ArrayCache(cache_bytes)
 
         if isinstance(filename, tables.File):
             pyt_file = filename
@@ -112,12 +420,30 @@ class H5File(Mapping):
     def open(self):
         if not self.is_open:
             self._h5 = tables.open_file(self.filename, mode=self.mode)
+        if self._cache is not None:
+            _read_caches[self._h5] = self._cache
+        _default_filters.setdefault(self._h5, self.h5filters)
 
     def close(self):
         if self.is_open:
+            _flush_buffered_nodes(self._h5)
+            _invalidate_path_index(self._h5)
+            cache = _read_caches.pop(self._h5, None)
+            if cache is not None:
+                cache.clear()
+            _default_filters.pop(self._h5, None)
             self._h5.close()
         self._h5 = None
 
+    @property
+    def cache(self):
+        """The `ArrayCache` of reads from the file, or None if reads aren't
+        cached.
+        """
+        if self._h5 is None:
+            return self._cache
+        return _read_caches.get(self._h5)
+
     @property
     def root(self):
         return self["/"]
@@ -147,13 +473,185 @@ class H5File(Mapping):
         return (_wrap_node(n) for n in self._h5.iter_nodes(where="/"))
 
     def __len__(self):
-        return iterator_length(self)
+        return len(_get_path_index(self._h5).children["/"])
+
+    def iteritems(self, path="/", node_class=None, pattern=None):
+        """Iterate over node paths and nodes of the h5 file.
+
+        The nodes are found with a path index of the file, so nodes which are
+        filtered out by `pattern`, or by a `node_class` which only matches
+        groups, are never loaded or wrapped.
+
+        Parameters
+        ----------
+        path : str
+            Path of the node to start from. The node itself is included.
+        node_class : class or tuple of classes
+            If given, only return nodes which are instances of these classes
+            once wrapped; e.g. `H5Group`, `H5DictNode`, `H5PackedNode`,
+            `H5SparseNode`, `H5TableNode`, `H5VLArrayNode` or
+            `tables.Array`.
+        pattern : str
+            If given, only return nodes whose path matches this glob pattern
+            (see `fnmatch`). Note that '*' also matches '/'.
+        """
+        pyt_file = self._h5
+        index = _get_path_index(pyt_file)
+        if node_class is not None and not isinstance(node_class, tuple):
+            node_class = (node_class,)
+        skip_leaves = node_class is not None and all(
+            issubclass(cls, _GROUP_NODE_CLASSES) for cls in node_class
+        )
+
+        def matches(node_path):
+            if pattern is not None and not fnmatchcase(node_path, pattern):
+                return False
+            if node_class is None:
+                return True
+            if skip_leaves and not index.is_group(node_path):
+                return False
+            cls = index.node_class(pyt_file, node_path)
+            return issubclass(cls, node_class)
+
+        path = pyt_file.get_node(path)._v_pathname
+        if matches(path):
+            yield path, _wrap_node(pyt_file.get_node(path))
+
+        if not index.is_group(path):
+            return
+
+        # Same order as `tables.File.walk_nodes`.
+        for group_path in index.walk_groups(path):
+            prefix = group_path.rstrip("/") + "/"
+            for name in sorted(index.children[group_path]):
+                node_path = prefix + name
+                if matches(node_path):
+                    yield node_path, _wrap_node(pyt_file.get_node(node_path))
+
+    def read(self, node_path, key=None):
+        """Read data from an array node, through the cache if enabled.
+
+        Cached arrays are read-only. The cache doesn't see changes made
+        through the PyTables nodes themselves (e.g. `node[i] = x`); call
+        `cache.invalidate(node_path)` after such changes.
 
-    def iteritems(self, path="/"):
-        """ Iterate over node paths and nodes of the h5 file. """
-        for node in self._h5.walk_nodes(where=path):
-            node_path = node._v_pathname
-            yield node_path, _wrap_node(node)
+        Parameters
+        ----------
+        node_path : str
+            PyTable node path; e.g. '/path/to/node'.
+        key : index, slice or tuple of these
+            The part of the array to read, as used for `node[key]`. If None,
+            the whole array is read.
+        """
+        node = self._h5.get_node(node_path)
+        if not isinstance(node, tables.Array):
+            msg = "{!r} is not an array node."
+            raise ValueError(msg.format(node_path))
+        if key is None:
+            key = slice(None)
+        cache = self.cache
+        if cache is None:
+            return node[key]
+        return cache.read(node, node._v_pathname, key)
+
+    def read_into(self, node_path, out, start=None, stop=None):
+        """Read rows of an array node into a preallocated array.
+
+        The rows are read directly into `out` when its dtype matches the
+        node and the rows to fill are contiguous, so reading fixed-size
+        windows in a loop doesn't allocate a new array for each window.
+        Otherwise the rows are read into a temporary array and copied to
+        `out`. The read cache isn't used.
+
+        Parameters
+        ----------
+        node_path : str
+            PyTable node path; e.g. '/path/to/node'.
+        out : ndarray
+            The array to fill. It may have more rows than are read, e.g. for
+            the last window of an array, in which case only the first rows
+            are filled.
+        start, stop : int
+            The range of rows to read, with the same meaning as for a slice.
+            By default, all rows are read.
+
+        Returns
+        -------
+        rows : ndarray
+            The part of `out` which was filled.
+        """
+        node = self._h5.get_node(node_path)
+        if not isinstance(node, tables.Array):
+            msg = "{!r} is not an array node."
+            raise ValueError(msg.format(node_path))
+        start, stop, _ = slice(start, stop).indices(node.nrows)
+        n_rows = max(0, stop - start)
+
+        maindim = node.maindim
+        shape = list(node.shape)
+        shape[maindim] = n_rows
+        out_shape = list(out.shape)
+        if len(out_shape) == len(shape) and out_shape[maindim] >= n_rows:
+            out_shape[maindim] = n_rows
+        if out_shape != shape:
+            msg = "Cannot read {} rows of shape {} into an array of shape {}."
+            raise ValueError(msg.format(n_rows, node.shape, out.shape))
+
+        rows = out[(slice(None),) * maindim + (slice(0, n_rows),)]
+        if (
+            node.flavor == "numpy"
+            and rows.flags.c_contiguous
+            and rows.dtype == node.atom.dtype
+        ):
+            node.read(start, stop, out=rows)
+        else:
+            rows[...] = node.read(start, stop)
+        return rows
+
+    def as_memmap(self, node_path):
+        """Return the data of an array node as a read-only `numpy.memmap`.
+
+        The data is paged in by the operating system as it is accessed, so
+        random access into large arrays doesn't read the whole array. Only
+        contiguous, uncompressed arrays can be mapped, which are the arrays
+        created by `create_array` with `chunked=False` and
+        `extendable=False`. The data of other array nodes is read into
+        memory instead.
+
+        Parameters
+        ----------
+        node_path : str
+            PyTable node path; e.g. '/path/to/node'.
+        """
+        node = self._h5.get_node(node_path)
+        if not isinstance(node, tables.Array):
+            msg = "{!r} is not an array node."
+            raise ValueError(msg.format(node_path))
+
+        offset = _get_dataset_offset(node)
+        if offset is None:
+            return node.read()
+
+        if self._h5.mode != "r":
+            # Make sure that the mapped data is on disk.
+            self._h5.flush()
+        byteorder = {"little": "<", "big": ">"}.get(node.byteorder, "=")
+        return np.memmap(
+            self._h5.filename,
+            dtype=node.dtype.newbyteorder(byteorder),
+            mode="r",
+            offset=offset,
+            shape=node.shape,
+        )
+
+    def invalidate_index(self):
+        """Discard the path index of the file.
+
+        The index is kept up to date when nodes are created or removed with
+        `H5File` and its nodes. Call this method after changing the layout of
+        the file directly with PyTables.
+        """
+        _invalidate_path_index(self._h5)
 
     def create_array(
         self,
@@ -162,6 +660,9 @@ class H5File(Mapping):
         dtype=None,
         chunked=False,
         extendable=False,
+        filters=None,
+        access=None,
+        total_length=None,
         **kwargs
     ):
         """Create node to store an array.
@@ -170,15 +671,30 @@ class H5File(Mapping):
         ----------
         node_path : str
             PyTable node path; e.g. '/path/to/node'.
-        array_or_shape : array or shape tuple
+        array_or_shape : array, shape tuple or iterator of arrays
             Array or shape tuple for an array. If given a shape tuple, the
-            `dtype` parameter must also specified.
+            `dtype` parameter must also specified. If given an iterator (e.g.
+            a generator), it must yield blocks of rows which are written as
+            they arrive, so the whole array never needs to be in memory.
         dtype : str or numpy.dtype
             Data type of array. Only necessary if `array_or_shape` is a shape.
+            Blocks yielded by an iterator are converted to this type.
         chunked : bool
             Controls whether the array is chunked.
         extendable : {None | bool}
             Controls whether the array is extendable.
+        filters : tables.Filters
+            Compression filters for a chunked or extendable array. Defaults
+            to the `h5filters` of the file.
+        access : {None | 'rows' | 'columns'}
+            The expected access pattern of a chunked or extendable array. If
+            given, and `chunkshape` isn't, the chunkshape is chosen with
+            `guess_chunkshape`.
+        total_length : int
+            The total number of rows yielded by an iterator of blocks. If
+            given, and the array isn't extendable, a chunked array of this
+            length is allocated up front; otherwise the blocks are appended
+            to an extendable array.
         kwargs : key/value pairs
             Keyword args passed to PyTables `File.create_(c|e)array`.
         """
@@ -187,6 +703,21 @@ class H5File(Mapping):
 
         h5 = self._h5
 
+        if filters is None:
+            filters = self.h5filters
+
+        if isinstance(array_or_shape, Iterator):
+            return self._create_array_from_blocks(
+                node_path,
+                array_or_shape,
+                dtype,
+                extendable,
+                filters,
+                access,
+                total_length,
+                kwargs,
+            )
+
         if isinstance(array_or_shape, tuple):
             if dtype is None:
                 msg = "`dtype` must be specified if only given array shape."
@@ -202,16 +733,20 @@ class H5File(Mapping):
         path, name = self.split_path(node_path)
         if extendable:
             shape = (0,) + shape[1:]
+            if access is not None and "chunkshape" not in kwargs:
+                kwargs["chunkshape"] = guess_chunkshape(shape, dtype, access)
             atom = get_atom(dtype)
             node = h5.create_earray(
-                path, name, atom, shape, filters=self.h5filters, **kwargs
+                path, name, atom, shape, filters=filters, **kwargs
             )
             if array is not None:
                 node.append(array)
         elif chunked:
+            if access is not None and "chunkshape" not in kwargs:
+                kwargs["chunkshape"] = guess_chunkshape(shape, dtype, access)
             atom = get_atom(dtype)
             node = h5.create_carray(
-                path, name, atom, shape, filters=self.h5filters, **kwargs
+                path, name, atom, shape, filters=filters, **kwargs
             )
             if array is not None:
                 node[:] = array
@@ -221,6 +756,72 @@ class H5File(Mapping):
             node = h5.create_array(path, name, array, **kwargs)
         return node
 
+    def _create_array_from_blocks(
+        self,
+        node_path,
+        blocks,
+        dtype,
+        extendable,
+        filters,
+        access,
+        total_length,
+        kwargs,
+    ):
+        """Create an array node and write the blocks of an iterator to it.
+        """
+        first = next(blocks, None)
+        if first is None:
+            raise ValueError("Cannot create an array from an empty iterator.")
+        first = np.asarray(first, dtype=dtype)
+        if first.ndim == 0:
+            raise ValueError("Blocks must have at least one dimension.")
+        dtype = first.dtype
+        blocks = chain([first], blocks)
+
+        preallocate = total_length is not None and not extendable
+        if preallocate:
+            shape = (total_length,) + first.shape[1:]
+        else:
+            shape = (0,) + first.shape[1:]
+            if total_length is not None:
+                kwargs.setdefault("expectedrows", total_length)
+        if access is not None and "chunkshape" not in kwargs:
+            kwargs["chunkshape"] = guess_chunkshape(shape, dtype, access)
+
+        h5 = self._h5
+        path, name = self.split_path(node_path)
+        atom = get_atom(dtype)
+        if preallocate:
+            node = h5.create_carray(
+                path, name, atom, shape, filters=filters, **kwargs
+            )
+        else:
+            node = h5.create_earray(
+                path, name, atom, shape, filters=filters, **kwargs
+            )
+
+        try:
+            n_rows = 0
+            for block in blocks:
+                block = np.asarray(block, dtype=dtype)
+                if preallocate:
+                    if n_rows + len(block) > total_length:
+                        msg = "The blocks hold more than {} rows."
+                        raise ValueError(msg.format(total_length))
+                    node[n_rows:n_rows + len(block)] = block
+                else:
+                    node.append(block)
+                n_rows += len(block)
+
+            if preallocate and n_rows != total_length:
+                msg = "The blocks hold {} rows, but {} were expected."
+                raise ValueError(msg.format(n_rows, total_length))
+        except Exception:
+            # Don't leave a partly written node behind.
+            self.remove_node(node_path)
+            raise
+        return node
+
     def create_group(self, group_path, **kwargs):
         """Create group.
 
@@ -246,11 +847,62 @@ class H5File(Mapping):
             Path to node where data is stored (e.g. '/path/to/my_dict')
         data : dict
             Data for initialization, if desired.
+        kwargs : key/value pairs
+            Keyword args passed to `H5DictNode.add_to_h5file`, e.g.
+            `auto_flush` or `filters`.
         """
         self._check_node(node_path)
         self._assert_valid_path(node_path)
-        H5DictNode.add_to_h5file(self, node_path, data=data, **kwargs)
-        return self[node_path]
+        return H5DictNode.add_to_h5file(self, node_path, data=data, **kwargs)
+
+    def create_packed(self, node_path, data=None, filters=None, **kwargs):
+        """Create packed node, which stores many small arrays, at the
+        specified path.
+
+        Parameters
+        ----------
+        node_path : str
+            Path to node where data is stored (e.g. '/path/to/my_arrays')
+        data : dict
+            Arrays for initialization, if desired.
+        filters : tables.Filters
+            Compression filters. Defaults to the `h5filters` of the file.
+        kwargs : key/value pairs
+            Keyword args passed to `H5PackedNode.add_to_h5file`, e.g.
+            `dtype`.
+        """
+        self._check_node(node_path)
+        self._assert_valid_path(node_path)
+        if filters is None:
+            filters = self.h5filters
+        return H5PackedNode.add_to_h5file(
+            self, node_path, data=data, filters=filters, **kwargs
+        )
+
+    def create_sparse(
+        self, node_path, shape, rows, cols, values, filters=None
+    ):
+        """Create sparse matrix node at the specified path.
+
+        Parameters
+        ----------
+        node_path : str
+            Path to node where data is stored (e.g. '/path/to/my_matrix')
+        shape : tuple of int
+            The shape of the matrix.
+        rows, cols, values : array
+            The matrix in coordinate format; see
+            `H5SparseNode.add_to_h5file`.
+        filters : tables.Filters
+            Compression filters. Defaults to the `h5filters` of the file.
+        """
+        self._check_node(node_path)
+        self._assert_valid_path(node_path)
+        if filters is None:
+            filters = self.h5filters
+        return H5SparseNode.add_to_h5file(
+            self, node_path, shape, rows, cols, values, filters=filters
+        )
 
     def create_table(self, node_path, description, **kwargs):
         """Create table node at the specified path.
@@ -263,17 +915,53 @@ class H5File(Mapping):
             The description of the columns in the table. This is either a dict
             of column name -> dtype items or a numpy record array dtype. For
             more information, see the documentation for Table in pytables.
+        buffer_rows, flush_interval : int, float
+            Settings for buffering appended rows; see `H5TableNode`.
+        kwargs : key/value pairs
+            Keyword args passed to PyTables `File.create_table`, e.g.
+            `filters` to compress the table.
         """
         self._check_node(node_path)
         self._assert_valid_path(node_path)
-        H5TableNode.add_to_h5file(self, node_path, description, **kwargs)
-        return self[node_path]
+        return H5TableNode.add_to_h5file(
+            self, node_path, description, **kwargs
+        )
+
+    def create_vlarray(self, node_path, atom_dtype, filters=None, **kwargs):
+        """Create variable-length array node, which stores rows of different
+        lengths, at the specified path.
+
+        Parameters
+        ----------
+        node_path : str
+            Path to node where data is stored (e.g. '/path/to/my_rows')
+        atom_dtype : numpy dtype
+            The dtype of the items of the rows; see
+            `H5VLArrayNode.add_to_h5file`.
+        filters : tables.Filters
+            Compression filters. Defaults to the `h5filters` of the file.
+        kwargs : key/value pairs
+            Keyword args passed to PyTables `File.create_vlarray`, e.g.
+            `expectedrows`.
+        """
+        self._check_node(node_path)
+        self._assert_valid_path(node_path)
+        if filters is None:
+            filters = self.h5filters
+        return H5VLArrayNode.add_to_h5file(
+            self, node_path, atom_dtype, filters=filters, **kwargs
+        )
 
     def _check_node(self, node_path):
         """Check if node exists and create parent groups if necessary.
 
         Either raise error or delete depending on `delete_existing` attribute.
         """
+        # Called before any node is created, so the path index is rebuilt on
+        # the next access.
+        _invalidate_path_index(self._h5)
+        _invalidate_read_cache(self._h5, node_path)
+
         if self.auto_groups:
             path, name = self.split_path(node_path)
             self._create_required_groups(path)
@@ -308,6 +996,8 @@ class H5File(Mapping):
             msg = "{!r} is a group. Use `remove_group` to remove group nodes."
             raise ValueError(msg.format(node.pathname))
         node._f_remove()
+        _invalidate_path_index(self._h5)
+        _invalidate_read_cache(self._h5, node_path)
 
     def remove_group(self, group_path, **kwargs):
         """Remove group
@@ -318,6 +1008,86 @@ class H5File(Mapping):
             PyTable group path; e.g. '/path/to/group'.
         """
         self[group_path]._h5_group._g_remove(**kwargs)
+        _invalidate_path_index(self._h5)
+        _invalidate_read_cache(self._h5, group_path)
+
+    def copy_node(
+        self, src_path, dest_h5=None, dest_path=None, recursive=True
+    ):
+        """Copy a node of this file to this or another file.
+
+        Chunked arrays and tables are copied chunk by chunk without
+        decompressing them, so the copy keeps the filters and chunkshape of
+        the original. Other nodes are copied with PyTables. Attributes are
+        copied along with the nodes, and dict, packed and sparse nodes are
+        always copied with their arrays.
+
+        Parameters
+        ----------
+        src_path : str
+            Path of the node to copy; e.g. '/path/to/node'.
+        dest_h5 : H5File
+            The file to copy to. Defaults to this file.
+        dest_path : str
+            Path of the copy. Defaults to `src_path`. Parent groups are
+            created if `auto_groups` is set on `dest_h5`, and an existing
+            node is replaced if `delete_existing` is set on `dest_h5`.
+        recursive : bool
+            If True, the children of a group are copied as well.
+        """
+        if dest_h5 is None:
+            dest_h5 = self
+        if dest_path is None:
+            dest_path = src_path
+
+        node = self._h5.get_node(src_path)
+        src_path = node._v_pathname
+        same_file = dest_h5._h5 is self._h5
+        # This includes the path of the node itself, which `_check_node`
+        # would remove with `delete_existing`.
+        inside_src = (dest_path.rstrip("/") + "/").startswith(
+            src_path.rstrip("/") + "/"
+        )
+        if same_file and inside_src:
+            msg = "Cannot copy {!r} onto or into itself."
+            raise ValueError(msg.format(src_path))
+
+        dest_h5._check_node(dest_path)
+        dest_h5._assert_valid_path(dest_path)
+        path, name = dest_h5.split_path(dest_path)
+        parent = dest_h5._h5.get_node(path)
+        node_class = _node_class(node)
+        if node_class is not H5Group and node_class in _GROUP_NODE_CLASSES:
+            # Nodes stored in groups are only complete with their children.
+            recursive = True
+        _copy_pyt_node(node, parent, name, recursive)
+        return dest_h5[dest_path]
+
+    def merge(self, other, where="/"):
+        """Copy the nodes of another file into this file.
+
+        Groups which exist in both files are merged. Other nodes which exist
+        in both files are replaced if `delete_existing` is set, otherwise a
+        ValueError is raised. Nodes are copied with `copy_node`.
+
+        Parameters
+        ----------
+        other : H5File
+            The file to copy nodes from.
+        where : str
+            Path of the group to merge; e.g. '/path/to/group'.
+        """
+        group = other._h5.get_node(where)
+        for name in list(group._v_children.keys()):
+            node_path = self.join_path(where, name)
+            if (
+                node_path in self
+                and isinstance(self[node_path], H5Group)
+                and isinstance(other[node_path], H5Group)
+            ):
+                self.merge(other, node_path)
+            else:
+                other.copy_node(node_path, self, node_path)
 
     @classmethod
     def _assert_valid_path(self, node_path):
@@ -434,7 +1204,7 @@ class H5Group(Mapping):
         return (_wrap_node(c) for c in self._h5_group)
 
     def __len__(self):
-        return iterator_length(self)
+        return len(self._index_children())
 
     @property
     def pathname(self):
@@ -454,11 +1224,17 @@ class H5Group(Mapping):
 
     @property
     def children_names(self):
-        return list(self._h5_group._v_children.keys())
+        return list(self._index_children())
 
     @property
     def subgroup_names(self):
-        return list(self._h5_group._v_groups.keys())
+        index = _get_path_index(self._h5_group._v_file)
+        prefix = self.pathname.rstrip("/") + "/"
+        return [
+            name
+            for name in self._index_children()
+            if index.is_group(prefix + name)
+        ]
 
     def iter_groups(self):
         """ Iterate over `H5Group` nodes that are children of this group. """
@@ -492,6 +1268,9 @@ class H5Group(Mapping):
         dtype=None,
         chunked=False,
         extendable=False,
+        filters=None,
+        access=None,
+        total_length=None,
         **kwargs
     ):
         return self._delegate_to_h5file(
@@ -501,6 +1280,9 @@ class H5Group(Mapping):
             dtype=dtype,
             chunked=chunked,
             extendable=extendable,
+            filters=filters,
+            access=access,
+            total_length=total_length,
             **kwargs
         )
 
@@ -516,27 +1298,160 @@ class H5Group(Mapping):
             "create_dict", node_subpath, data=data, **kwargs
         )
 
+    @h5_group_wrapper(H5File.create_packed)
+    def create_packed(self, node_subpath, data=None, **kwargs):
+        return self._delegate_to_h5file(
+            "create_packed", node_subpath, data=data, **kwargs
+        )
+
+    @h5_group_wrapper(H5File.create_sparse)
+    def create_sparse(self, node_subpath, shape, rows, cols, values, **kwargs):
+        return self._delegate_to_h5file(
+            "create_sparse", node_subpath, shape, rows, cols, values, **kwargs
+        )
+
+    @h5_group_wrapper(H5File.create_vlarray)
+    def create_vlarray(self, node_subpath, atom_dtype, **kwargs):
+        return self._delegate_to_h5file(
+            "create_vlarray", node_subpath, atom_dtype, **kwargs
+        )
+
+    @h5_group_wrapper(H5File.read)
+    def read(self, node_subpath, key=None):
+        return self._delegate_to_h5file("read", node_subpath, key=key)
+
+    @h5_group_wrapper(H5File.read_into)
+    def read_into(self, node_subpath, out, start=None, stop=None):
+        return self._delegate_to_h5file(
+            "read_into", node_subpath, out, start, stop
+        )
+
     @h5_group_wrapper(H5File.remove_node)
     def remove_node(self, node_subpath, **kwargs):
         return self._delegate_to_h5file("remove_node", node_subpath, **kwargs)
 
+    def _index_children(self):
+        """ Return the names of the children of the group. """
+        index = _get_path_index(self._h5_group._v_file)
+        return index.children[self.pathname]
+
     def _delegate_to_h5file(
         self, function_name, node_subpath, *args, **kwargs
     ):
         delete_existing = kwargs.pop("delete_existing", False)
-        h5 = H5File(self._h5_group._v_file, delete_existing=delete_existing)
+        pyt_file = self._h5_group._v_file
+        h5 = H5File(
+            pyt_file,
+            delete_existing=delete_existing,
+            h5filters=_default_filters.get(pyt_file),
+        )
         group_path = h5.join_path(self.pathname, node_subpath)
         func = getattr(h5, function_name)
         return func(group_path, *args, **kwargs)
 
 
+#: Classes of the nodes which are stored as PyTables groups.
+_GROUP_NODE_CLASSES = (H5Group, H5DictNode, H5PackedNode, H5SparseNode)
+
+
+def _copy_pyt_node(node, parent, name, recursive):
+    """ Copy a PyTables node to `parent`, possibly in another file. """
+    if isinstance(node, tables.Group):
+        new_node = node._f_copy(parent, name, recursive=False)
+        if recursive:
+            for child_name, child in node._v_children.items():
+                _copy_pyt_node(child, new_node, child_name, recursive)
+        return new_node
+    if isinstance(node, tables.Table):
+        # Write the buffered rows of the table, so they are copied too.
+        buffered = _buffered_table_node(node)
+        if buffered is not None:
+            buffered.flush()
+    if (
+        isinstance(node, (tables.CArray, tables.Table))
+        and hasattr(node, "read_chunk")
+    ):
+        return _copy_chunks(node, parent, name)
+    return node._f_copy(parent, name)
+
+
+def _copy_chunks(node, parent, name):
+    """Copy a chunked array or table by copying its compressed chunks.
+    """
+    pyt_file = parent._v_file
+    kwargs = dict(
+        filters=node.filters, chunkshape=node.chunkshape, title=node.title
+    )
+    if isinstance(node, tables.Table):
+        new_node = pyt_file.create_table(
+            parent, name, node.description, expectedrows=node.nrows, **kwargs
+        )
+    elif isinstance(node, tables.EArray):
+        shape = list(node.shape)
+        shape[node.extdim] = 0
+        new_node = pyt_file.create_earray(
+            parent, name, node.atom, shape, expectedrows=node.nrows, **kwargs
+        )
+    else:
+        new_node = pyt_file.create_carray(
+            parent, name, node.atom, node.shape, **kwargs
+        )
+    if new_node.nrows != node.nrows:
+        new_node.truncate(node.nrows)
+    node._v_attrs._f_copy(new_node)
+
+    ranges = [
+        range(0, length, chunk_length)
+        for length, chunk_length in zip(node.shape, node.chunkshape)
+    ]
+    for coords in product(*ranges):
+        info = node.chunk_info(coords)
+        if info.offset is None:
+            # The chunk was never written.
+            continue
+        new_node.write_chunk(coords, node.read_chunk(coords), info.filter_mask)
+
+    if isinstance(node, tables.Table):
+        for column, index in node.colindexes.items():
+            new_node.colinstances[column].create_index(
+                optlevel=index.optlevel, kind=index.kind
+            )
+    return new_node
+
+
+def _node_class(node):
+    """ Return the class of a PyTables node once wrapped by `_wrap_node`. """
+    if isinstance(node, tables.Group):
+        if H5DictNode.is_dict_node(node):
+            return H5DictNode
+        if H5PackedNode.is_packed_node(node):
+            return H5PackedNode
+        if H5SparseNode.is_sparse_node(node):
+            return H5SparseNode
+        return H5Group
+    elif H5TableNode.is_table_node(node):
+        return H5TableNode
+    elif H5VLArrayNode.is_vlarray_node(node):
+        return H5VLArrayNode
+    return type(node)
+
+
 def _wrap_node(node):
     """ Wrap PyTables node object, if necessary. """
     if isinstance(node, tables.Group):
         if H5DictNode.is_dict_node(node):
             node = H5DictNode(node)
+        elif H5PackedNode.is_packed_node(node):
+            node = H5PackedNode(node)
+        elif H5SparseNode.is_sparse_node(node):
+            node = H5SparseNode(node)
         else:
             node = H5Group(node)
     elif H5TableNode.is_table_node(node):
-        node = H5TableNode(node)
+        # Return the node with rows in its append buffer, if any, so that
+        # they are seen by reads.
+        buffered = _buffered_table_node(node)
+        node = H5TableNode(node) if buffered is None else buffered
+    elif H5VLArrayNode.is_vlarray_node(node):
+        node = H5VLArrayNode(node)
     return node
@@ -0,0 +1,323 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import numpy as np
+
+from tables import Atom, Group as PyTablesGroup, Int64Col, StringCol
+
+
+#: Default maximum length of the names in a packed node, in UTF-8 bytes.
+DEFAULT_NAME_LENGTH = 64
+
+
+class H5PackedNode(object):
+    """Dictionary-like node storing many small arrays in a few HDF5 nodes.
+
+    The arrays are concatenated along their first axis into a single
+    extendable array, and a table maps each name to the range of rows of its
+    array. This avoids the metadata overhead of one HDF5 node per array,
+    which dominates the file size and the time to create and open nodes
+    when there are many small arrays.
+
+    All arrays share the same dtype and the same shape apart from their
+    length. The index is read when the node is opened, so looking up an array
+    reads only its rows.
+
+    Setting an existing name writes the new array at the end of the data and
+    leaves the rows of the old array unused; deleting a name also leaves its
+    rows unused. Copy the arrays to a new node to reclaim that space.
+
+    Parameters
+    ----------
+    h5_group : H5Group instance
+        Group node where the packed arrays are stored.
+    """
+
+    #: Name of the node where the concatenated arrays are stored.
+    _data_node = "_packed_data"
+
+    #: Name of the table with the name, start and stop of each array.
+    _index_node = "_packed_index"
+
+    def __init__(self, h5_group):
+        assert self.is_packed_node(h5_group)
+
+        if hasattr(h5_group, "_h5_group"):
+            h5_group = h5_group._h5_group
+        self._h5_group = h5_group
+        self._data = getattr(h5_group, self._data_node)
+        self._table = getattr(h5_group, self._index_node)
+
+        # Mapping of name -> (row in the index table, start, stop).
+        index = self._table.read()
+        names = [name.decode("utf-8") for name in index["name"]]
+        self._index = dict(
+            zip(
+                names,
+                zip(
+                    range(len(names)),
+                    index["start"].tolist(),
+                    index["stop"].tolist(),
+                ),
+            )
+        )
+
+    # --------------------------------------------------------------------------
+    #  Dictionary interface
+    # --------------------------------------------------------------------------
+
+    def __getitem__(self, name):
+        _, start, stop = self._index[name]
+        return self._data[start:stop]
+
+    def __setitem__(self, name, array):
+        self.update({name: array})
+
+    def __delitem__(self, name):
+        row, _, _ = self._index.pop(name)
+        self._table.remove_rows(row, row + 1)
+        for key, (other_row, start, stop) in self._index.items():
+            if other_row > row:
+                self._index[key] = (other_row - 1, start, stop)
+        self._invalidate_file_caches(layout_changed=False)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return self._index.keys()
+
+    def update(self, *args, **kwargs):
+        """Store arrays from a mapping or iterable of name/array pairs and/or
+        keyword arguments, like `dict.update`.
+
+        The arrays are written with a single append to the data and to the
+        index, so storing many arrays at once is much faster than setting
+        them one by one.
+        """
+        items = dict(*args, **kwargs)
+        if not items:
+            return
+        arrays = [self._check_array(array) for array in items.values()]
+        names = [self._encode_name(name) for name in items]
+
+        start = self._data.nrows
+        stops = start + np.cumsum([len(array) for array in arrays])
+        starts = np.concatenate([[start], stops[:-1]])
+        if stops[-1] > start:
+            self._data.append(np.concatenate(arrays))
+
+        new_rows = []
+        for name, encoded, start, stop in zip(
+            items, names, starts.tolist(), stops.tolist()
+        ):
+            if name in self._index:
+                row = self._index[name][0]
+                self._table.modify_rows(
+                    row, row + 1, rows=[(encoded, start, stop)]
+                )
+            else:
+                row = self._table.nrows + len(new_rows)
+                new_rows.append((encoded, start, stop))
+            self._index[name] = (row, start, stop)
+        if new_rows:
+            self._table.append(new_rows)
+        self._invalidate_file_caches(layout_changed=False)
+
+    # --------------------------------------------------------------------------
+    #  Public interface
+    # --------------------------------------------------------------------------
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def item_shape(self):
+        """ The shape of the arrays apart from their length. """
+        return self._data.shape[1:]
+
+    def read_many(self, names=None):
+        """Return a dict of the arrays with the given names.
+
+        Arrays which are stored close together are read in a single read, so
+        this is faster than looking up each array in turn.
+
+        Parameters
+        ----------
+        names : iterable of str
+            The names of the arrays to read. By default, all arrays are read.
+        """
+        if names is None:
+            names = list(self._index)
+        ranges = sorted(
+            (self._index[name][1:] + (name,) for name in names),
+            key=lambda r: r[0],
+        )
+        # Reading the rows between two arrays costs little if they are in
+        # the same chunk.
+        max_gap = self._data.chunkshape[0]
+
+        arrays = {}
+        i = 0
+        while i < len(ranges):
+            block_start, block_stop, _ = ranges[i]
+            j = i + 1
+            while j < len(ranges) and ranges[j][0] - block_stop <= max_gap:
+                block_stop = max(block_stop, ranges[j][1])
+                j += 1
+            block = self._data[block_start:block_stop]
+            for start, stop, name in ranges[i:j]:
+                arrays[name] = block[start - block_start:stop - block_start]
+            i = j
+        return arrays
+
+    def flush(self):
+        """ Flush the data and the index to disk. """
+        self._data.flush()
+        self._table.flush()
+
+    @classmethod
+    def add_to_h5file(
+        cls,
+        h5,
+        node_path,
+        data=None,
+        dtype=None,
+        item_shape=None,
+        name_length=DEFAULT_NAME_LENGTH,
+        filters=None,
+        expected_size=None,
+    ):
+        """Add packed node to an H5 file at the specified path.
+
+        Parameters
+        ----------
+        h5 : H5File
+            The H5 file where the packed node will be stored.
+        node_path : str
+            Path to node where data is stored (e.g. '/path/to/my_arrays')
+        data : dict
+            Arrays for initialization, if desired.
+        dtype : numpy dtype
+            The dtype of the arrays. Defaults to the dtype of the first array
+            in `data`.
+        item_shape : tuple of int
+            The shape of the arrays apart from their length. Defaults to that
+            of the first array in `data`, or to () for 1D arrays.
+        name_length : int
+            The maximum length of the names, in UTF-8 bytes.
+        filters : tables.Filters
+            If given, the data is compressed with these filters.
+        expected_size : int
+            The expected total length of the arrays, which PyTables uses to
+            choose the chunk size of the data.
+        """
+        if data:
+            first = np.asarray(next(iter(data.values())))
+            if dtype is None:
+                dtype = first.dtype
+            if item_shape is None:
+                item_shape = first.shape[1:]
+        if dtype is None:
+            raise ValueError("The dtype of a packed node must be given.")
+        if item_shape is None:
+            item_shape = ()
+
+        h5.create_group(node_path)
+        pyt_file = h5._h5
+        group = pyt_file.get_node(node_path)
+        kwargs = {} if filters is None else {"filters": filters}
+        if expected_size is not None:
+            kwargs["expectedrows"] = expected_size
+        pyt_file.create_earray(
+            group,
+            cls._data_node,
+            atom=Atom.from_dtype(np.dtype(dtype)),
+            shape=(0,) + tuple(item_shape),
+            **kwargs
+        )
+        description = {
+            "name": StringCol(name_length, pos=0),
+            "start": Int64Col(pos=1),
+            "stop": Int64Col(pos=2),
+        }
+        pyt_file.create_table(group, cls._index_node, description)
+
+        node = cls(group)
+        node._invalidate_file_caches()
+        if data:
+            node.update(data)
+        return node
+
+    @classmethod
+    def is_packed_node(cls, pytables_node):
+        """Return True if PyTables node looks like an H5PackedNode.
+
+        NOTE: That this returns False if the node is an `H5PackedNode`
+        instance, since the input node should be a normal PyTables Group node.
+        """
+        if hasattr(pytables_node, "_h5_group"):
+            pytables_node = pytables_node._h5_group
+
+        if not isinstance(pytables_node, PyTablesGroup):
+            return False
+
+        children = pytables_node._v_children
+        return cls._data_node in children and cls._index_node in children
+
+    # --------------------------------------------------------------------------
+    #  Private interface
+    # --------------------------------------------------------------------------
+
+    def _f_remove(self):
+        """This is called by H5File whenever a node is removed.
+
+        The data, the index and the group are removed.
+        """
+        self._h5_group._f_remove(recursive=True)
+
+    def _check_array(self, array):
+        """Return `array` as an array with the dtype of the node.
+
+        Raises a ValueError if its shape or dtype don't match the node.
+        """
+        array = np.asarray(array)
+        if array.shape[1:] != self.item_shape or array.ndim == 0:
+            msg = "Cannot store an array of shape {} with item shape {}."
+            raise ValueError(msg.format(array.shape, self.item_shape))
+        if not np.can_cast(array.dtype, self.dtype, casting="same_kind"):
+            msg = "Cannot store an array of dtype {} in a node of dtype {}."
+            raise ValueError(msg.format(array.dtype, self.dtype))
+        return array.astype(self.dtype, copy=False)
+
+    def _encode_name(self, name):
+        encoded = name.encode("utf-8")
+        if len(encoded) > self._table.coldtypes["name"].itemsize:
+            msg = "Name {!r} is longer than the maximum name length."
+            raise ValueError(msg.format(name))
+        return encoded
+
+    def _invalidate_file_caches(self, layout_changed=True):
+        """Tell H5File that the data of the node, and possibly its nodes,
+        were changed.
+        """
+        # Import here to prevent circular imports
+        from .file import _invalidate_path_index, _invalidate_read_cache
+
+        pyt_file = self._h5_group._v_file
+        if layout_changed:
+            _invalidate_path_index(pyt_file)
+        _invalidate_read_cache(pyt_file, self._h5_group._v_pathname)
@@ -0,0 +1,91 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+from contextlib import nullcontext
+import threading
+
+from .file import H5File, hdf5_is_threadsafe
+
+
+class H5ReaderPool(object):
+    """A pool of read-only `H5File` handles, one per thread.
+
+    PyTables file handles must not be shared between threads. The pool opens
+    a separate handle of the file for each thread which reads from it, so
+    several threads can read different nodes concurrently.
+
+    If the HDF5 library isn't thread-safe, reads through `read` are
+    serialized by a lock, and code using the handles returned by `get`
+    directly must hold `lock` while doing so.
+
+    Parameters
+    ----------
+    filename : str
+        HDF5 file name.
+    kwargs : key/value pairs
+        Keyword args passed to `H5File`, e.g. `cache_bytes`. Each handle has
+        its own cache.
+    """
+
+    def __init__(self, filename, **kwargs):
+        self.filename = filename
+        self._kwargs = kwargs
+
+        #: Lock serializing access to the HDF5 library, if it's needed.
+        self.lock = threading.RLock()
+
+        # Opening and closing files changes the registry of open files of
+        # PyTables, so it's always done under this lock.
+        self._open_lock = threading.Lock()
+        self._local = threading.local()
+        self._handles = []
+        self._closed = False
+
+        if hdf5_is_threadsafe():
+            self._read_lock = nullcontext()
+        else:
+            self._read_lock = self.lock
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """ Return the number of open handles. """
+        return len(self._handles)
+
+    def get(self):
+        """ Return the `H5File` handle of the current thread. """
+        h5 = getattr(self._local, "h5", None)
+        if h5 is None or not h5.is_open:
+            with self._open_lock, self._read_lock:
+                if self._closed:
+                    raise ValueError("The reader pool is closed.")
+                h5 = H5File(self.filename, mode="r", **self._kwargs)
+                self._handles.append(h5)
+            self._local.h5 = h5
+        return h5
+
+    def read(self, node_path, key=None):
+        """Read data from an array node with the handle of the current
+        thread. See `H5File.read`.
+        """
+        h5 = self.get()
+        with self._read_lock:
+            return h5.read(node_path, key=key)
+
+    def close(self):
+        """ Close the handles of all threads. """
+        with self._open_lock, self._read_lock:
+            self._closed = True
+            handles, self._handles = self._handles, []
+            for h5 in handles:
+                h5.close()
@@ -0,0 +1,238 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import numpy as np
+
+from tables import Group as PyTablesGroup
+
+
+#: Group attribute with the shape of the sparse matrix.
+SHAPE_ATTR = "SPARSE_SHAPE"
+
+#: Approximate size of the dense blocks yielded by `iter_chunks`.
+DEFAULT_BLOCK_BYTES = 2**24
+
+
+class H5SparseNode(object):
+    """A sparse 2D matrix stored in compressed sparse row (CSR) format.
+
+    The nonzero values, their column indices and the offsets of the rows in
+    these arrays are stored in three arrays in a group, so disk use and read
+    times scale with the number of nonzero values rather than with the size
+    of the dense matrix. Rows are read as dense arrays.
+
+    The CSR components can be read with `read_csr`, e.g. to create a
+    `scipy.sparse.csr_matrix`.
+
+    Parameters
+    ----------
+    h5_group : H5Group instance
+        Group node where the sparse matrix is stored.
+    """
+
+    #: Names of the nodes with the nonzero values, their column indices and
+    #: the offsets of the rows.
+    _data_node = "_sparse_data"
+    _indices_node = "_sparse_indices"
+    _indptr_node = "_sparse_indptr"
+
+    def __init__(self, h5_group):
+        assert self.is_sparse_node(h5_group)
+
+        if hasattr(h5_group, "_h5_group"):
+            h5_group = h5_group._h5_group
+        self._h5_group = h5_group
+        self._data = getattr(h5_group, self._data_node)
+        self._indices = getattr(h5_group, self._indices_node)
+        self._indptr = getattr(h5_group, self._indptr_node)
+        self.shape = tuple(int(n) for n in h5_group._v_attrs[SHAPE_ATTR])
+
+    # --------------------------------------------------------------------------
+    #  Public interface
+    # --------------------------------------------------------------------------
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def nnz(self):
+        """ The number of stored values. """
+        return self._data.nrows
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        """Return a row, or a range of rows, as a dense array.
+
+        Parameters
+        ----------
+        key : int or slice
+            A row number or a slice of rows with a step of 1.
+        """
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("Only slices with a step of 1 are supported.")
+            return self.read_rows(key.start, key.stop)
+
+        row = range(self.shape[0])[key]
+        return self.read_rows(row, row + 1)[0]
+
+    def read_rows(self, start=None, stop=None):
+        """Return a range of rows as a dense array.
+
+        Only the nonzero values of these rows are read from disk.
+
+        Parameters
+        ----------
+        start, stop : int
+            The range of rows to read, with the same meaning as for a slice.
+        """
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        n_rows = max(0, stop - start)
+        indptr = self._indptr[start:start + n_rows + 1]
+        lo, hi = indptr[0], indptr[-1]
+
+        dense = np.zeros((n_rows, self.shape[1]), dtype=self.dtype)
+        rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+        dense[rows, self._indices[lo:hi]] = self._data[lo:hi]
+        return dense
+
+    def iter_chunks(self, chunk_rows=None):
+        """Iterate over the rows of the matrix in dense blocks.
+
+        Only one block is held in memory at a time, so this can be used for
+        matrices whose dense form is larger than the available memory.
+
+        Parameters
+        ----------
+        chunk_rows : int
+            The number of rows per block. By default, blocks take about
+            `DEFAULT_BLOCK_BYTES` bytes.
+        """
+        if chunk_rows is None:
+            row_bytes = self.shape[1] * self.dtype.itemsize
+            chunk_rows = max(1, DEFAULT_BLOCK_BYTES // max(1, row_bytes))
+        for start in range(0, self.shape[0], chunk_rows):
+            yield self.read_rows(start, start + chunk_rows)
+
+    def read_csr(self):
+        """ Return the CSR components `(data, indices, indptr)`. """
+        return self._data[:], self._indices[:], self._indptr[:]
+
+    @classmethod
+    def add_to_h5file(
+        cls, h5, node_path, shape, rows, cols, values, filters=None
+    ):
+        """Add sparse node to an H5 file at the specified path.
+
+        The matrix is given in coordinate format. Values at the same
+        position are summed.
+
+        Parameters
+        ----------
+        h5 : H5File
+            The H5 file where the sparse matrix will be stored.
+        node_path : str
+            Path to node where data is stored (e.g. '/path/to/my_matrix')
+        shape : tuple of int
+            The shape of the matrix.
+        rows, cols : array of int
+            The row and column indices of the values.
+        values : array
+            The values of the matrix at `rows` and `cols`.
+        filters : tables.Filters
+            If given, the arrays are compressed with these filters.
+        """
+        n_rows, n_cols = shape
+        rows = np.asarray(rows, dtype=np.int64).ravel()
+        cols = np.asarray(cols, dtype=np.int64).ravel()
+        values = np.asarray(values).ravel()
+        if not len(rows) == len(cols) == len(values):
+            msg = "The rows, cols and values must have the same length."
+            raise ValueError(msg)
+        if len(rows) and (
+            rows.min() < 0
+            or rows.max() >= n_rows
+            or cols.min() < 0
+            or cols.max() >= n_cols
+        ):
+            msg = "Indices out of bounds for a matrix of shape {}."
+            raise ValueError(msg.format(shape))
+
+        data, indices, indptr = _coo_to_csr(n_rows, n_cols, rows, cols, values)
+
+        h5.create_group(node_path)
+        pyt_file = h5._h5
+        group = pyt_file.get_node(node_path)
+        group._v_attrs[SHAPE_ATTR] = np.array(shape, dtype=np.int64)
+        for name, array in [
+            (cls._data_node, data),
+            (cls._indices_node, indices),
+            (cls._indptr_node, indptr),
+        ]:
+            if array.size > 0:
+                pyt_file.create_carray(group, name, obj=array, filters=filters)
+            else:
+                pyt_file.create_array(group, name, array)
+
+        # Import here to prevent circular imports
+        from .file import _invalidate_path_index
+
+        _invalidate_path_index(pyt_file)
+        return cls(group)
+
+    @classmethod
+    def is_sparse_node(cls, pytables_node):
+        """Return True if PyTables node looks like an H5SparseNode.
+
+        NOTE: That this returns False if the node is an `H5SparseNode`
+        instance, since the input node should be a normal PyTables Group node.
+        """
+        if hasattr(pytables_node, "_h5_group"):
+            pytables_node = pytables_node._h5_group
+
+        if not isinstance(pytables_node, PyTablesGroup):
+            return False
+
+        children = pytables_node._v_children
+        return cls._indptr_node in children and cls._data_node in children
+
+    # --------------------------------------------------------------------------
+    #  Private interface
+    # --------------------------------------------------------------------------
+
+    def _f_remove(self):
+        """This is called by H5File whenever a node is removed.
+
+        The arrays and the group are removed.
+        """
+        self._h5_group._f_remove(recursive=True)
+
+
+def _coo_to_csr(n_rows, n_cols, rows, cols, values):
+    """Return the CSR components of a matrix in coordinate format, summing
+    duplicate entries.
+
+    Column indices are stored as 32 bit integers if possible.
+    """
+    order = np.lexsort((cols, rows))
+    rows, cols, values = rows[order], cols[order], values[order]
+    if len(rows) > 1:
+        is_new = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        if not is_new.all():
+            starts = np.flatnonzero(np.concatenate([[True], is_new]))
+            rows, cols = rows[starts], cols[starts]
+            values = np.add.reduceat(values, starts)
+
+    index_dtype = np.int32 if n_cols <= np.iinfo(np.int32).max else np.int64
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return values, cols.astype(index_dtype), indptr
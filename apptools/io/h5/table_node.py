@@ -7,11 +7,23 @@
 # is also available online at http://www.enthought.com/licenses/BSD.txt
 #
 # Thanks for using Enthought open source!
+from time import monotonic
+
 import numpy as np
+from numpy.lib.recfunctions import repack_fields
 
 from tables.table import Table as PyTablesTable
 
 
+#: Table nodes with rows in their append buffer, so they can be flushed on
+#: file close. The references keep the nodes alive until their rows are
+#: written, even if the caller drops them.
+_buffered_nodes = set()
+
+#: Approximate size of the blocks of rows read when selecting columns.
+READ_BLOCK_BYTES = 2**24
+
+
 class _TableRowAccessor(object):
     """A simple object which provides read access to the rows in a Table."""
 
@@ -29,9 +41,16 @@ class H5TableNode(object):
     ----------
     node : tables.Table instance
         An H5 node which is a pytables.Table or H5TableNode instance
+    buffer_rows : int
+        If given, appended rows are collected in a buffer of this many rows
+        and written in one go when it is full. The buffer is also written by
+        `flush()`, by reads of the table and when the `H5File` is closed.
+    flush_interval : float
+        If given with `buffer_rows`, the buffer is also written by an append
+        if this many seconds have passed since it was last written.
     """
 
-    def __init__(self, node):
+    def __init__(self, node, buffer_rows=None, flush_interval=None):
         # Avoid a circular import
         from .file import H5Attrs
 
@@ -39,6 +58,13 @@ class H5TableNode(object):
         self._h5_table = node._h5_table if hasattr(node, "_h5_table") else node
         self.attrs = H5Attrs(self._h5_table._v_attrs)
 
+        self.flush_interval = flush_interval
+        self._buffer = None
+        self._n_buffered = 0
+        self._last_flush = monotonic()
+        if buffer_rows is not None:
+            self._buffer = np.empty(buffer_rows, dtype=self._h5_table.dtype)
+
     # --------------------------------------------------------------------------
     #  Creation methods
     # --------------------------------------------------------------------------
@@ -58,16 +84,23 @@ class H5TableNode(object):
             of (column name, dtype, [, shape or itemsize]) tuples or a numpy
             record array dtype. For more information, see the documentation for
             `Table` in PyTables.
+        buffer_rows, flush_interval : int, float
+            Settings for buffering appended rows; see `H5TableNode`.
         **kwargs : dict
             Additional keyword arguments to pass to pytables.File.create_table
         """
         if isinstance(description, (tuple, list)):
             description = np.dtype(description)
 
+        buffer_rows = kwargs.pop("buffer_rows", None)
+        flush_interval = kwargs.pop("flush_interval", None)
+
         cls._create_pytables_node(h5, node_path, description, **kwargs)
         node = h5[node_path]
 
-        return cls(node)
+        return cls(
+            node, buffer_rows=buffer_rows, flush_interval=flush_interval
+        )
 
     @classmethod
     def is_table_node(cls, pytables_node):
@@ -82,13 +115,26 @@ class H5TableNode(object):
     def append(self, data):
         """Add some data to the table.
 
+        The data is written as a single record array, without creating a
+        Python object per row.
+
         Parameters
         ----------
-        data : dict
-            A dictionary of column name -> values items
+        data : dict or numpy structured array
+            A dictionary of column name -> values items, or a structured
+            array whose fields match the columns of the table.
         """
-        rows = list(zip(*[data[name] for name in self.keys()]))
-        self._h5_table.append(rows)
+        records = self._as_records(data)
+        if self._buffer is None:
+            self._h5_table.append(records)
+        else:
+            self._buffer_records(records)
+
+    def flush(self):
+        """ Write any buffered rows to the table and flush it to disk. """
+        self._flush_buffer()
+        self._h5_table.flush()
+        self._last_flush = monotonic()
 
     def __getitem__(self, col_or_cols):
         """Return one or more columns of data from the table.
@@ -104,31 +150,269 @@ class H5TableNode(object):
             An array of column data with the column order matching that of
             `col_or_cols`.
         """
+        self._flush_buffer()
         if isinstance(col_or_cols, str):
             return self._h5_table.col(col_or_cols)
 
-        column_data = [self._h5_table.col(name) for name in col_or_cols]
-        return np.column_stack(column_data)
+        # Read all the requested columns in a single pass over the table.
+        rows = self.read(col_or_cols)
+        return np.column_stack([rows[name] for name in col_or_cols])
+
+    def read(self, columns=None, start=None, stop=None, step=None):
+        """Return a range of rows for some of the columns.
+
+        Parameters
+        ----------
+        columns : str or list of str
+            A single column name, or a list of column names. By default, all
+            columns are read.
+        start, stop, step : int
+            The range of rows to read, with the same meaning as for a slice.
+
+        Return
+        ------
+        data : ndarray
+            For a single column name, an array of that column's data.
+            Otherwise, a structured array with only the requested fields.
+        """
+        self._flush_buffer()
+        start, stop, step = self._row_range(start, stop, step)
+        if isinstance(columns, str):
+            return self._h5_table.read(start, stop, step, field=columns)
+
+        return self._read_fields(columns, start, stop, step)
+
+    def read_into(self, out, start=None, stop=None, column=None):
+        """Read a range of rows into a preallocated array.
+
+        The rows are read directly into `out` when its dtype matches the
+        table (or column) and it is contiguous, so reading fixed-size
+        windows in a loop doesn't allocate a new array for each window.
+
+        Parameters
+        ----------
+        out : ndarray
+            The array to fill. It may have more rows than are read, in which
+            case only the first rows are filled.
+        start, stop : int
+            The range of rows to read, with the same meaning as for a slice.
+        column : str
+            A single column to read. By default, all columns are read.
+
+        Return
+        ------
+        rows : ndarray
+            The part of `out` which was filled.
+        """
+        self._flush_buffer()
+        table = self._h5_table
+        start, stop, _ = self._row_range(start, stop, None)
+        n_rows = max(0, stop - start)
+        if column is None:
+            dtype = table.dtype
+        else:
+            dtype = table.coldtypes[column]
+        if out.shape[1:] != dtype.shape or len(out) < n_rows:
+            msg = "Cannot read {} rows of dtype {} into an array of shape {}."
+            raise ValueError(msg.format(n_rows, dtype, out.shape))
+
+        rows = out[:n_rows]
+        # PyTables only reads into arrays in the native byte order.
+        if rows.flags.c_contiguous and rows.dtype == dtype.base:
+            table.read(start, stop, field=column, out=rows)
+        else:
+            rows[...] = table.read(start, stop, field=column)
+        return rows
+
+    def iter_chunks(self, columns=None, chunk_rows=None):
+        """Iterate over the rows of the table in fixed-size blocks.
+
+        Only one block is held in memory at a time, so this can be used for
+        tables which are larger than the available memory.
+
+        Parameters
+        ----------
+        columns : str or list of str
+            The columns to read; see `read`.
+        chunk_rows : int
+            The number of rows per block. This is rounded up to a multiple of
+            the number of rows in a chunk of the HDF5 table, so blocks line
+            up with the chunks stored on disk. By default, a block is a
+            single HDF5 chunk.
+
+        Yields
+        ------
+        data : ndarray
+            The data for each block of rows; see `read`.
+        """
+        self._flush_buffer()
+        chunk_rows = self._chunk_rows(chunk_rows)
+        for start in range(0, self._h5_table.nrows, chunk_rows):
+            yield self.read(columns, start, start + chunk_rows)
+
+    def where(
+        self,
+        condition,
+        columns=None,
+        condvars=None,
+        start=None,
+        stop=None,
+        step=None,
+    ):
+        """Return the rows which satisfy a condition.
+
+        The condition is evaluated in-kernel by PyTables, so only the
+        matching rows are loaded into memory. If the condition involves
+        indexed columns (see `create_index`), only the matching chunks are
+        read from disk.
+
+        Parameters
+        ----------
+        condition : str
+            A PyTables condition on the columns, e.g. '(a > 1) & (b == 0)'.
+        columns : str or list of str
+            The columns to return; see `read`.
+        condvars : dict
+            Values for variables in `condition` that are not column names.
+        start, stop, step : int
+            The range of rows to search.
+
+        Return
+        ------
+        data : ndarray
+            The matching rows; see `read`.
+        """
+        self._flush_buffer()
+        condvars = {} if condvars is None else condvars
+        table = self._h5_table
+        start, stop, step = self._row_range(start, stop, step)
+        if isinstance(columns, str):
+            return table.read_where(
+                condition,
+                condvars,
+                field=columns,
+                start=start,
+                stop=stop,
+                step=step,
+            )
+        rows = table.read_where(
+            condition, condvars, start=start, stop=stop, step=step
+        )
+        return _select_fields(rows, columns)
+
+    def iter_where(
+        self, condition, columns=None, condvars=None, chunk_rows=None
+    ):
+        """Iterate over the rows which satisfy a condition in blocks.
+
+        This is the equivalent of `where` for results which may not fit in
+        memory.
+
+        Parameters
+        ----------
+        condition : str
+            A PyTables condition on the columns; see `where`.
+        columns : str or list of str
+            The columns to return; see `read`.
+        condvars : dict
+            Values for variables in `condition` that are not column names.
+        chunk_rows : int
+            The number of rows searched per block; see `iter_chunks`. If the
+            query uses an index, this is instead the number of matching rows
+            per block.
+
+        Yields
+        ------
+        data : ndarray
+            The matching rows in each block; see `read`.
+        """
+        self._flush_buffer()
+        condvars = {} if condvars is None else condvars
+        table = self._h5_table
+        chunk_rows = self._chunk_rows(chunk_rows)
+
+        if table.will_query_use_indexing(condition, condvars):
+            # Only the row numbers of matches are held in memory.
+            coords = table.get_where_list(condition, condvars, sort=True)
+            for start in range(0, len(coords), chunk_rows):
+                block = coords[start:start + chunk_rows]
+                if isinstance(columns, str):
+                    yield table.read_coordinates(block, field=columns)
+                else:
+                    rows = table.read_coordinates(block)
+                    yield _select_fields(rows, columns)
+        else:
+            for start in range(0, table.nrows, chunk_rows):
+                yield self.where(
+                    condition,
+                    columns,
+                    condvars,
+                    start=start,
+                    stop=start + chunk_rows,
+                )
+
+    def create_index(self, column, **kwargs):
+        """Create a completely sorted index on a column.
+
+        Indexes speed up `where` and `iter_where` queries on the column.
+        They are kept up to date as data is appended to the table.
+
+        Parameters
+        ----------
+        column : str
+            The name of the column to index.
+        **kwargs : dict
+            Additional keyword arguments to pass to PyTables
+            `Column.create_csindex`.
+
+        Return
+        ------
+        n_rows : int
+            The number of rows indexed.
+        """
+        self._flush_buffer()
+        return self._h5_table.colinstances[column].create_csindex(**kwargs)
 
     @property
     def ix(self):
         """Return an object which provides access to row data."""
+        self._flush_buffer()
         return _TableRowAccessor(self._h5_table)
 
     def keys(self):
         return self._h5_table.colnames
 
-    def to_dataframe(self):
+    def to_dataframe(
+        self, columns=None, start=None, stop=None, chunksize=None
+    ):
         """Return table data as a pandas `DataFrame`.
 
-        XXX: This does not work if the table contains a multidimensional column
+        Multidimensional columns are expanded into one column per element,
+        with the indices of the element as suffix; e.g. a column 'pos' of
+        shape (3,) becomes the columns 'pos_0', 'pos_1' and 'pos_2'. The
+        index of the DataFrame is the row numbers in the table.
 
         This method requires pandas to have been installed in the environment.
+
+        Parameters
+        ----------
+        columns : str or list of str
+            The columns to read. By default, all columns are read.
+        start, stop : int
+            The range of rows to read, with the same meaning as for a slice.
+        chunksize : int
+            If given, return an iterator over DataFrames of up to this many
+            rows instead, so that only one chunk is held in memory at a time.
         """
-        from pandas import DataFrame
+        if isinstance(columns, str):
+            columns = [columns]
+        if chunksize is not None:
+            return self._iter_dataframes(columns, start, stop, chunksize)
 
-        # Slicing rows gives a numpy struct array, which DataFrame understands.
-        return DataFrame(self.ix[:])
+        self._flush_buffer()
+        start, stop, _ = self._row_range(start, stop, None)
+        records = self.read(columns, start, stop)
+        return _records_to_dataframe(records, range(start, max(start, stop)))
 
     # --------------------------------------------------------------------------
     #  Object interface
@@ -138,16 +422,141 @@ class H5TableNode(object):
         return repr(self._h5_table)
 
     def __len__(self):
-        return self._h5_table.nrows
+        return self._h5_table.nrows + self._n_buffered
 
     # --------------------------------------------------------------------------
     #  Private interface
     # --------------------------------------------------------------------------
 
+    def _buffer_records(self, records):
+        """ Add records to the append buffer, writing it when necessary. """
+        buffer = self._buffer
+        n_records = len(records)
+        if self._n_buffered + n_records > len(buffer):
+            self._flush_buffer()
+
+        if n_records >= len(buffer):
+            # Too big to be worth buffering.
+            self._h5_table.append(records)
+        else:
+            start = self._n_buffered
+            buffer[start:start + n_records] = records
+            self._n_buffered += n_records
+            _buffered_nodes.add(self)
+            if self._n_buffered == len(buffer):
+                self._flush_buffer()
+
+        interval = self.flush_interval
+        if interval is not None and monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def _flush_buffer(self):
+        """ Write any buffered rows to the table, without flushing to disk.
+        """
+        if self._n_buffered:
+            self._h5_table.append(self._buffer[:self._n_buffered])
+            self._n_buffered = 0
+            self._last_flush = monotonic()
+            _buffered_nodes.discard(self)
+
+    def _row_range(self, start, stop, step):
+        """Return slice-style row range arguments as explicit integers.
+
+        PyTables reads a single row if `start` is given without `stop`, and
+        doesn't support reading rows in reverse.
+        """
+        if step is not None and step < 1:
+            msg = "The step must be a positive integer, not {!r}."
+            raise ValueError(msg.format(step))
+        return slice(start, stop, step).indices(self._h5_table.nrows)
+
+    def _chunk_rows(self, chunk_rows):
+        """ Round a number of rows up to a multiple of the chunkshape. """
+        rows_per_chunk = self._h5_table.chunkshape[0]
+        if chunk_rows is None:
+            return rows_per_chunk
+        n_chunks = max(1, -(-chunk_rows // rows_per_chunk))
+        return n_chunks * rows_per_chunk
+
+    def _read_fields(self, columns, start, stop, step=1):
+        """Return a range of rows for some of the columns.
+
+        The rows are read in blocks, so only the selected columns of all the
+        rows are held in memory.
+        """
+        table = self._h5_table
+        if columns is None:
+            return table.read(start, stop, step)
+
+        fields = list(columns)
+        records = np.empty(
+            len(range(start, stop, step)),
+            dtype=repack_fields(table.dtype[fields]),
+        )
+        block_rows = self._chunk_rows(READ_BLOCK_BYTES // table.rowsize)
+        # Start every block on a selected row.
+        block_rows = -(-block_rows // step) * step
+        offset = 0
+        for block_start in range(start, stop, block_rows):
+            block_stop = min(stop, block_start + block_rows)
+            block = table.read(block_start, block_stop, step)
+            records[offset:offset + len(block)] = block[fields]
+            offset += len(block)
+        return records
+
+    def _iter_dataframes(self, columns, start, stop, chunksize):
+        """ Yield DataFrames of up to `chunksize` rows. """
+        self._flush_buffer()
+        start, stop, _ = self._row_range(start, stop, None)
+        for block_start in range(start, stop, chunksize):
+            block_stop = min(stop, block_start + chunksize)
+            records = self.read(columns, block_start, block_stop)
+            yield _records_to_dataframe(
+                records, range(block_start, block_stop)
+            )
+
+    def _as_records(self, data):
+        """Return `data` as a record array with the dtype of the table.
+
+        Raises a ValueError if `data` doesn't match the table description.
+        """
+        dtype = self._h5_table.dtype
+
+        if isinstance(data, np.ndarray):
+            if data.dtype.names is None:
+                msg = "Expected a structured array, got dtype {!r}."
+                raise ValueError(msg.format(data.dtype))
+            if data.dtype == dtype:
+                return data
+            if set(data.dtype.names) != set(dtype.names):
+                msg = "Fields {!r} do not match the table columns {!r}."
+                raise ValueError(msg.format(data.dtype.names, dtype.names))
+            columns = {name: data[name] for name in dtype.names}
+        else:
+            columns = {name: np.asarray(data[name]) for name in dtype.names}
+
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            msg = "Columns have different lengths: {!r}."
+            raise ValueError(msg.format(sorted(lengths)))
+        n_rows = lengths.pop() if lengths else 0
+
+        records = np.empty(n_rows, dtype=dtype)
+        for name, values in columns.items():
+            try:
+                records[name] = values
+            except (TypeError, ValueError) as e:
+                msg = "Cannot store values in column {!r}: {}"
+                raise ValueError(msg.format(name, e))
+        return records
+
     def _f_remove(self):
         """Implement the PyTables `Node._f_remove` method so that H5File
         doesn't choke when trying to remove our node.
         """
+        self._buffer = None
+        self._n_buffered = 0
+        _buffered_nodes.discard(self)
         self._h5_table._f_remove()
         self._h5_table = None
 
@@ -156,3 +565,54 @@ class H5TableNode(object):
         path, name = h5.split_path(node_path)
         pyt_file = h5._h5
         pyt_file.create_table(path, name, description, **kwargs)
+        h5.invalidate_index()
+
+
+def _select_fields(rows, columns):
+    """ Return the given columns of a structured array of rows. """
+    if columns is None:
+        return rows
+    # Indexing with a list of fields gives a view with padding for the other
+    # fields, so repack it to drop the unused data.
+    return repack_fields(rows[list(columns)])
+
+
+def _records_to_dataframe(records, index):
+    """Return a structured array as a DataFrame, with multidimensional and
+    nested fields expanded into one column per element.
+    """
+    from pandas import DataFrame
+
+    data = {}
+    for name in records.dtype.names:
+        _add_flat_columns(data, name, records[name])
+    return DataFrame(data, index=index, columns=list(data))
+
+
+def _add_flat_columns(data, name, values):
+    """ Add the values of a field to `data` as 1D columns. """
+    if values.dtype.names is not None:
+        for field in values.dtype.names:
+            _add_flat_columns(data, name + "_" + field, values[field])
+    elif values.ndim > 1:
+        for element in np.ndindex(values.shape[1:]):
+            suffix = "_".join(str(i) for i in element)
+            data[name + "_" + suffix] = values[(slice(None),) + element]
+    else:
+        data[name] = values
+
+
+def _buffered_table_node(table):
+    """ Return the table node with buffered rows for a PyTables table. """
+    for node in _buffered_nodes:
+        if node._h5_table is table:
+            return node
+    return None
+
+
+def _flush_buffered_nodes(pyt_file):
+    """ Flush the append buffers of all table nodes in a PyTables file. """
+    for node in list(_buffered_nodes):
+        table = node._h5_table
+        if table is not None and table._v_isopen and table._v_file is pyt_file:
+            node.flush()
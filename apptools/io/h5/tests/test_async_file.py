@@ -0,0 +1,140 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import asyncio
+import threading
+import unittest
+
+from apptools._testing.optional_dependencies import (
+    numpy as np,
+    tables,
+    requires_numpy,
+    requires_tables,
+)
+
+if np is not None and tables is not None:
+    from ..async_file import AsyncH5File
+    from .utils import temp_file
+
+
+def create_wide_earray(h5, array):
+    """ Create an EArray at '/earray' whose extendable axis is the last. """
+    earray = h5._h5.create_earray(
+        "/",
+        "earray",
+        tables.Atom.from_dtype(array.dtype),
+        shape=array.shape[:-1] + (0,),
+    )
+    earray.append(array)
+    h5.invalidate_index()
+
+
+@requires_numpy
+@requires_tables
+class AsyncH5FileTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_arrays(self):
+        array = np.arange(100.0).reshape(25, 4)
+        with temp_file(suffix=".h5") as filename:
+            async with AsyncH5File(filename, mode="w") as afile:
+                await afile.create_array("/array", array, chunked=True)
+                group = await afile.create_group("/group")
+                await group.create_array("sub", array[:5])
+
+                np.testing.assert_array_equal(
+                    await afile.read("/array", slice(2, 4)), array[2:4]
+                )
+                np.testing.assert_array_equal(
+                    await group.read("sub"), array[:5]
+                )
+                assert await group.children_names() == ["sub"]
+                assert await afile.contains("/group/sub")
+
+                blocks = [
+                    block
+                    async for block in afile.iter_chunks(
+                        "/array", chunk_rows=10
+                    )
+                ]
+                assert [len(block) for block in blocks] == [10, 10, 5]
+                np.testing.assert_array_equal(np.concatenate(blocks), array)
+
+                # Rows are along the extendable axis of an EArray.
+                await afile.run(create_wide_earray, array.T)
+                blocks = [
+                    block
+                    async for block in afile.iter_chunks(
+                        "/earray", chunk_rows=10
+                    )
+                ]
+                shapes = [block.shape for block in blocks]
+                assert shapes == [(4, 10), (4, 10), (4, 5)]
+
+                thread_names = await asyncio.gather(
+                    *[
+                        afile.run(lambda h5: threading.current_thread().name)
+                        for _ in range(5)
+                    ]
+                )
+                assert len(set(thread_names)) == 1
+                assert thread_names[0] != threading.current_thread().name
+
+                await afile.remove_node("/array")
+                assert not await afile.contains("/array")
+
+            assert not afile.is_open
+            with self.assertRaises(ValueError):
+                await afile.read("/group/sub")
+
+    async def test_table(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_file(suffix=".h5") as filename:
+            async with AsyncH5File(filename, mode="w") as afile:
+                table = await afile.create_table(
+                    "/table", description, chunkshape=(4,)
+                )
+                await asyncio.gather(
+                    *[table.append({"a": [i], "b": [i]}) for i in range(10)]
+                )
+                assert await table.size() == 10
+
+                rows = await table.read(columns=["b"], start=2, stop=4)
+                np.testing.assert_array_equal(rows["b"], [2, 3])
+                rows = await table.where("b > 6")
+                assert sorted(rows["b"]) == [7, 8, 9]
+
+                blocks = [
+                    block async for block in table.iter_chunks(chunk_rows=4)
+                ]
+                assert [len(block) for block in blocks] == [4, 4, 2]
+
+    async def test_buffered_table(self):
+        description = [("a", np.float64)]
+        with temp_file(suffix=".h5") as filename:
+            async with AsyncH5File(filename, mode="w") as afile:
+                group = await afile.create_group("/group")
+                table = await group.create_table(
+                    "table", description, buffer_rows=100
+                )
+                for i in range(10):
+                    await table.append({"a": [i]})
+                n_written = await afile.run(
+                    lambda h5: h5["/group/table"]._h5_table.nrows
+                )
+                assert n_written == 0
+                assert await afile.table("/group/table").size() == 10
+
+                # A new table at the same path doesn't use the old buffer.
+                await afile.remove_node("/group/table")
+                table = await afile.create_table("/group/table", description)
+                await table.append({"a": [1, 2]})
+                assert await table.size() == 2
+
+            async with AsyncH5File(filename, mode="r") as afile:
+                rows = await afile.table("/group/table").read("a")
+                np.testing.assert_array_equal(rows, [1, 2])
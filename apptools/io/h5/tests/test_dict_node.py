@@ -8,6 +8,7 @@
 #
 # Thanks for using Enthought open source!
 import unittest
+from unittest import mock
 
 from apptools._testing.optional_dependencies import (
     numpy as np,
@@ -17,7 +18,7 @@ from apptools._testing.optional_dependencies import (
 )
 
 if np is not None and tables is not None:
-    from ..dict_node import H5DictNode
+    from ..dict_node import ArrayProxy, H5DictNode
     from .utils import open_h5file, temp_h5_file, temp_file
 
 
@@ -112,6 +113,227 @@ class DictNodeTestCase(unittest.TestCase):
                 assert isinstance(h5dict["arr"], np.ndarray)
                 assert isinstance(h5dict["arr_old"], np.ndarray)
 
+    def test_flush_only_rewrites_changed_arrays(self):
+        with temp_h5_file() as h5:
+            data = dict(a=np.arange(10), b=np.arange(5), c=1)
+            h5dict = H5DictNode.add_to_h5file(h5, NODE, data)
+            group = h5dict._h5_group
+            # Mark the array nodes; a rewritten node loses its marker.
+            group.a._v_attrs.marker = True
+            group.b._v_attrs.marker = True
+
+            h5dict["c"] = 2
+            assert "marker" in group.a._v_attrs
+            assert "marker" in group.b._v_attrs
+
+            h5dict["b"] = np.arange(3)
+            assert "marker" in group.a._v_attrs
+            assert "marker" not in group.b._v_attrs
+
+            h5dict_from_disk = h5[NODE]
+            assert h5dict_from_disk["c"] == 2
+            np.testing.assert_array_equal(h5dict_from_disk["a"], np.arange(10))
+            np.testing.assert_array_equal(h5dict_from_disk["b"], np.arange(3))
+
+    def test_flush_after_replacing_data(self):
+        with temp_h5_file() as h5:
+            data = dict(a=np.arange(10), b=np.arange(5))
+            h5dict = H5DictNode.add_to_h5file(h5, NODE, data, auto_flush=False)
+            h5dict.data = dict(a=np.arange(2), b=3)
+            h5dict.flush()
+
+            assert "b" not in h5dict._h5_group
+            h5dict_from_disk = h5[NODE]
+            np.testing.assert_array_equal(h5dict_from_disk["a"], np.arange(2))
+            assert h5dict_from_disk["b"] == 3
+
+    def test_lazy(self):
+        arr = np.arange(100).reshape(10, 10)
+        with temp_h5_file() as h5:
+            H5DictNode.add_to_h5file(h5, NODE, dict(arr=arr, b=1))
+
+            h5dict = H5DictNode.from_h5file(h5, NODE, lazy=True)
+            proxy = h5dict["arr"]
+            assert isinstance(proxy, ArrayProxy)
+            assert proxy._array is None
+            assert proxy.shape == (10, 10)
+            assert proxy.dtype == arr.dtype
+            assert len(proxy) == 10
+
+            # Slicing reads only part of the array.
+            np.testing.assert_array_equal(proxy[2:4, 1], arr[2:4, 1])
+            assert proxy._array is None
+            np.testing.assert_array_equal(np.asarray(proxy), arr)
+            assert proxy._array is not None
+
+    def test_lazy_flush(self):
+        arr = np.arange(10)
+        with temp_h5_file() as h5:
+            H5DictNode.add_to_h5file(h5, NODE, dict(a=arr, b=arr))
+            h5dict = H5DictNode.from_h5file(h5, NODE, lazy=True)
+            h5dict._h5_group.a._v_attrs.marker = True
+
+            # Unchanged proxies are left as they are on disk.
+            h5dict["c"] = 1
+            assert "marker" in h5dict._h5_group.a._v_attrs
+            # Proxies which are set again are written as arrays.
+            h5dict["b"] = h5dict["b"]
+            h5dict["d"] = h5dict["a"]
+
+            h5dict_from_disk = h5[NODE]
+            for key in ("a", "b", "d"):
+                np.testing.assert_array_equal(h5dict_from_disk[key], arr)
+            assert h5dict_from_disk["c"] == 1
+
+    def test_lazy_shared_proxy(self):
+        arr = np.arange(10)
+        with temp_h5_file() as h5:
+            H5DictNode.add_to_h5file(h5, NODE, dict(y=arr))
+            h5dict = H5DictNode.from_h5file(h5, NODE, lazy=True)
+            proxy = h5dict["y"]
+            h5dict["x"] = h5dict["y"]
+            h5dict["z"] = [h5dict["y"], 1]
+            del h5dict["x"]
+
+            # The proxy still reads from the node of its own key.
+            assert h5dict["y"] is proxy
+            assert proxy.shape == (10,)
+            assert repr(proxy).startswith("ArrayProxy('{}/y'".format(NODE))
+            np.testing.assert_array_equal(h5dict["y"][2:4], [2, 3])
+            np.testing.assert_array_equal(h5dict["z"][0], arr)
+
+            del h5dict["z"]
+            h5dict_from_disk = h5[NODE]
+            assert "x" not in h5dict_from_disk
+            np.testing.assert_array_equal(h5dict_from_disk["y"], arr)
+
+    def test_batch(self):
+        with temp_h5_file() as h5:
+            h5dict = H5DictNode.add_to_h5file(h5, NODE, dict(a=1, b=2))
+            with mock.patch.object(
+                h5dict, "flush", wraps=h5dict.flush
+            ) as flush:
+                with h5dict.batch():
+                    for i in range(10):
+                        h5dict["x%d" % i] = i
+                    del h5dict["a"]
+                    with h5dict.batch():
+                        h5dict["arr"] = np.arange(3)
+                    assert flush.call_count == 0
+                    assert "x0" not in h5[NODE]
+                assert flush.call_count == 1
+
+            h5dict_from_disk = h5[NODE]
+            assert "a" not in h5dict_from_disk
+            assert h5dict_from_disk["x9"] == 9
+            np.testing.assert_array_equal(h5dict_from_disk["arr"], range(3))
+
+    def test_update(self):
+        with temp_h5_file() as h5:
+            h5dict = H5DictNode.add_to_h5file(h5, NODE, dict(a=1))
+            with mock.patch.object(
+                h5dict, "flush", wraps=h5dict.flush
+            ) as flush:
+                h5dict.update({"a": 2, "b": 3}, c=np.arange(4))
+                assert flush.call_count == 1
+
+            h5dict_from_disk = h5[NODE]
+            assert h5dict_from_disk["a"] == 2
+            assert h5dict_from_disk["b"] == 3
+            np.testing.assert_array_equal(h5dict_from_disk["c"], range(4))
+
+    def test_nested_arrays(self):
+        arr = np.arange(10)
+        with temp_file() as filename:
+            with open_h5file(filename, "w") as h5:
+                data = dict(a=[1, arr], b=dict(c=arr * 2, d=(arr * 3, "x")))
+                H5DictNode.add_to_h5file(h5, NODE, data)
+                children = set(h5[NODE]._h5_group._v_children)
+                assert {"a.1", "b.c", "b.d.0"} <= children
+
+            with open_h5file(filename, mode="r+") as h5:
+                h5dict = h5[NODE]
+                assert h5dict["a"][0] == 1
+                np.testing.assert_array_equal(h5dict["a"][1], arr)
+                np.testing.assert_array_equal(h5dict["b"]["c"], arr * 2)
+                np.testing.assert_array_equal(h5dict["b"]["d"][0], arr * 3)
+                assert h5dict["b"]["d"][1] == "x"
+
+                # Nested arrays of unchanged keys are not rewritten.
+                h5dict._h5_group["b.c"]._v_attrs.marker = True
+                h5dict["a"] = [arr * 4]
+                assert "marker" in h5dict._h5_group["b.c"]._v_attrs
+
+            with open_h5file(filename) as h5:
+                h5dict = h5[NODE]
+                np.testing.assert_array_equal(h5dict["a"][0], arr * 4)
+                assert "a.1" not in h5dict._h5_group
+
+    def test_nested_arrays_lazy(self):
+        arr = np.arange(10)
+        with temp_h5_file() as h5:
+            H5DictNode.add_to_h5file(h5, NODE, dict(a=[arr]))
+            h5dict = H5DictNode.from_h5file(h5, NODE, lazy=True)
+            assert isinstance(h5dict["a"][0], ArrayProxy)
+            np.testing.assert_array_equal(h5dict["a"][0][2:4], [2, 3])
+
+    def test_binary_metadata(self):
+        arr = np.arange(10)
+        data = dict(a=1, b=[1.5, "x", None], c=dict(d=arr), e=arr)
+        with temp_file() as filename:
+            with open_h5file(filename, "w") as h5:
+                H5DictNode.add_to_h5file(
+                    h5, NODE, data, binary_metadata=True
+                )
+
+            with open_h5file(filename, mode="r+") as h5:
+                h5dict = h5[NODE]
+                assert h5dict.binary_metadata
+                assert h5dict["a"] == 1
+                assert h5dict["b"] == [1.5, "x", None]
+                np.testing.assert_array_equal(h5dict["c"]["d"], arr)
+                np.testing.assert_array_equal(h5dict["e"], arr)
+                # The format is kept when the node is modified.
+                h5dict["f"] = 2
+
+            with open_h5file(filename) as h5:
+                h5dict = h5[NODE]
+                assert h5dict.binary_metadata
+                assert h5dict["f"] == 2
+
+    def test_convert_metadata_format(self):
+        with temp_h5_file() as h5:
+            H5DictNode.add_to_h5file(h5, NODE, dict(a=1))
+            h5dict = H5DictNode.from_h5file(h5, NODE, binary_metadata=True)
+            h5dict.flush()
+            assert h5[NODE].binary_metadata
+            assert h5[NODE]["a"] == 1
+
+    def test_numpy_scalars(self):
+        arr = np.arange(3)
+        data = dict(a=arr[1], b=[np.float32(1.5), np.bool_(True)])
+        for binary_metadata in (False, True):
+            with temp_h5_file() as h5:
+                H5DictNode.add_to_h5file(
+                    h5, NODE, data, binary_metadata=binary_metadata
+                )
+                h5dict = h5[NODE]
+                assert h5dict["a"] == 1
+                assert type(h5dict["a"]) is int
+                assert h5dict["b"] == [1.5, True]
+
+    def test_binary_metadata_unsupported_type(self):
+        with temp_h5_file() as h5:
+            h5dict = H5DictNode.add_to_h5file(
+                h5, NODE, binary_metadata=True
+            )
+            h5dict["a"] = 1
+            with self.assertRaises(TypeError):
+                h5dict["b"] = object()
+            # The data on disk is left as it was.
+            assert h5[NODE]["a"] == 1
+            assert "b" not in h5[NODE]
+
     def test_keys(self):
         with temp_h5_file() as h5:
             keys = set(("hello", "world", "baz1"))
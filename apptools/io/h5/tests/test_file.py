@@ -19,7 +19,7 @@ from apptools._testing.optional_dependencies import (
 )
 
 if np is not None and tables is not None:
-    from ..file import H5File
+    from ..file import guess_chunkshape, H5File
     from ..dict_node import H5DictNode
     from ..table_node import H5TableNode
     from .utils import open_h5file, temp_h5_file
@@ -105,6 +105,281 @@ class FileTestCase(unittest.TestCase):
 
         assert set(node_paths) == set(iter_paths)
 
+    def test_iteritems_filters(self):
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            h5.create_array("/a/x", np.arange(3))
+            h5.create_array("/a/b/y", np.arange(3), extendable=True)
+            h5.create_dict("/a/dict", {"z": np.arange(3)})
+            h5.create_table("/table", [("t", "f8")])
+
+            paths = [p for p, _ in h5.iteritems(node_class=tables.Array)]
+            assert sorted(paths) == [
+                "/a/b/y",
+                "/a/dict/_pyobject_data",
+                "/a/dict/z",
+                "/a/x",
+            ]
+
+            items = list(h5.iteritems(node_class=(H5DictNode, H5TableNode)))
+            assert sorted(p for p, _ in items) == ["/a/dict", "/table"]
+            assert isinstance(dict(items)["/a/dict"], H5DictNode)
+
+            paths = [p for p, _ in h5.iteritems(pattern="/a/*y")]
+            assert paths == ["/a/b/y"]
+
+            paths = [p for p, _ in h5.iteritems("/a/b")]
+            assert sorted(paths) == ["/a/b", "/a/b/y"]
+
+            paths = [p for p, _ in h5.iteritems("/a/x")]
+            assert paths == ["/a/x"]
+
+    def test_iteritems_order(self):
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            for path in ["/b/d/y", "/b/c", "/a/e/z", "/a/f/w", "/x", "/a/g"]:
+                h5.create_array(path, np.arange(3))
+
+            paths = [p for p, _ in h5.iteritems()]
+            assert paths == [n._v_pathname for n in h5._h5.walk_nodes("/")]
+            assert paths == [
+                "/",
+                "/a",
+                "/b",
+                "/x",
+                "/a/e",
+                "/a/f",
+                "/a/g",
+                "/b/c",
+                "/b/d",
+                "/b/d/y",
+                "/a/e/z",
+                "/a/f/w",
+            ]
+
+    def test_path_index_is_invalidated(self):
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            h5.create_array("/x", np.arange(3))
+            assert len(h5) == 1
+            group = h5.create_group("/group")
+            assert len(h5) == 2
+            assert group.children_names == []
+
+            group.create_array("y", np.arange(3))
+            group.create_group("sub")
+            assert sorted(group.children_names) == ["sub", "y"]
+            assert group.subgroup_names == ["sub"]
+            assert len(group) == 2
+
+            h5dict = group.create_dict("dict", {"a": np.arange(3)})
+            h5dict["b"] = np.arange(2)
+            paths = {p for p, _ in h5.iteritems("/group/dict")}
+            assert paths == {
+                "/group/dict",
+                "/group/dict/a",
+                "/group/dict/b",
+                "/group/dict/_pyobject_data",
+            }
+
+            h5.remove_node("/x")
+            h5.remove_group("/group/sub")
+            assert len(h5) == 1
+            assert sorted(group.subgroup_names) == ["dict"]
+
+            # Changes made with PyTables need an explicit invalidation.
+            h5._h5.create_array("/", "z", np.arange(3))
+            h5.invalidate_index()
+            assert len(h5) == 2
+
+    def test_as_memmap(self):
+        array = np.arange(12.0).reshape(3, 4)
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            h5.create_array("/plain", array)
+            h5.create_array("/big_endian", array.astype(">i4"))
+            h5.create_array("/chunked", array, chunked=True)
+            h5.create_group("/group")
+
+            # The data is flushed to disk before it is mapped.
+            mapped = h5.as_memmap("/plain")
+            assert isinstance(mapped, np.memmap)
+            np.testing.assert_array_equal(mapped, array)
+            with self.assertRaises(ValueError):
+                mapped[0, 0] = 1.0
+
+            mapped = h5.as_memmap("/big_endian")
+            assert isinstance(mapped, np.memmap)
+            np.testing.assert_array_equal(mapped, array)
+
+            # Chunked arrays are read instead.
+            read = h5.as_memmap("/chunked")
+            assert not isinstance(read, np.memmap)
+            np.testing.assert_array_equal(read, array)
+
+            with self.assertRaises(ValueError):
+                h5.as_memmap("/group")
+
+        with open_h5file(H5_TEST_FILE, mode="r") as h5:
+            mapped = h5.as_memmap("/plain")
+        # The map outlives the file.
+        np.testing.assert_array_equal(mapped[1], array[1])
+
+    def test_read(self):
+        array = np.arange(12.0).reshape(3, 4)
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            assert h5.cache is None
+            h5.create_array("/group/array", array, chunked=True)
+            np.testing.assert_array_equal(h5.read("/group/array"), array)
+            np.testing.assert_array_equal(
+                h5.read("/group/array", (slice(1, None), 2)), array[1:, 2]
+            )
+            group = h5["/group"]
+            np.testing.assert_array_equal(group.read("array", 1), array[1])
+            with self.assertRaises(ValueError):
+                h5.read("/group")
+
+    def test_read_into(self):
+        array = np.arange(20.0).reshape(10, 2)
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            h5.create_array("/group/array", array, chunked=True)
+            out = np.empty((4, 2))
+            for start in range(0, 10, 4):
+                rows = h5.read_into("/group/array", out, start, start + 4)
+                np.testing.assert_array_equal(rows, array[start:start + 4])
+                assert np.shares_memory(rows, out)
+            assert len(rows) == 2
+
+            group = h5["/group"]
+            out = np.empty((3, 2), dtype=">f8")
+            group.read_into("array", out, 7)
+            np.testing.assert_array_equal(out, array[7:])
+
+            # Other dtypes and non-contiguous outputs are filled by copying.
+            out = np.empty((2, 4), dtype=np.float32)
+            h5.read_into("/group/array", out[:, ::2], 0, 2)
+            np.testing.assert_array_equal(out[:, ::2], array[:2])
+
+            with self.assertRaises(ValueError):
+                h5.read_into("/group/array", np.empty((2, 2)), 0, 3)
+            with self.assertRaises(ValueError):
+                h5.read_into("/group/array", np.empty((3, 3)), 0, 3)
+            with self.assertRaises(ValueError):
+                h5.read_into("/group", np.empty(3))
+
+    def test_read_cache(self):
+        array = np.arange(12.0).reshape(3, 4)
+        with open_h5file(H5_TEST_FILE, mode="w", cache_bytes=64) as h5:
+            cache = h5.cache
+            h5.create_array("/group/array", array)
+
+            first = h5.read("/group/array", slice(0, 2))
+            second = h5["/group"].read("array", slice(0, 2))
+            assert second is first
+            assert not first.flags.writeable
+            assert (cache.hits, cache.misses) == (1, 1)
+            assert cache.nbytes == 64
+
+            # Fancy indexing bypasses the cache.
+            h5.create_array("/vector", np.arange(3))
+            np.testing.assert_array_equal(h5.read("/vector", [0, 2]), [0, 2])
+            assert (cache.hits, cache.misses) == (1, 1)
+
+            # The least recently used entry is evicted.
+            h5.read("/group/array", 2)
+            assert cache.nbytes == 32
+            assert len(cache) == 1
+
+            # Arrays larger than the cache aren't stored.
+            h5.read("/group/array")
+            assert len(cache) == 1
+
+            h5.delete_existing = True
+            h5.create_array("/group/array", array * 2)
+            assert len(cache) == 0
+            np.testing.assert_array_equal(
+                h5.read("/group/array", 0), array[0] * 2
+            )
+            h5.remove_group("/group", recursive=True)
+            assert len(cache) == 0
+
+            h5dict = h5.create_dict("/dict", {"a": np.arange(3)})
+            h5.read("/dict/a", 0)
+            h5dict["a"] = np.arange(3) + 1
+            assert h5.read("/dict/a", 0) == 1
+
+            stats = cache.stats()
+            assert stats["misses"] == 6
+            assert stats["max_bytes"] == 64
+        assert len(cache) == 0
+
+    def test_copy_node(self):
+        array = np.arange(1000.0).reshape(100, 10)
+        filters = tables.Filters(complevel=5, complib="zlib")
+        with temp_h5_file() as src, temp_h5_file() as dest:
+            src.create_array(
+                "/group/carray", array, chunked=True, filters=filters
+            )
+            src.create_array("/group/earray", array[0], extendable=True)
+            src.create_array("/group/plain", np.arange(3))
+            table = src.create_table(
+                "/group/table", [("x", "float"), ("y", "int")]
+            )
+            table.append({"x": np.arange(50.0), "y": np.arange(50)})
+            table.flush()
+            src.root._h5_group.group.table.cols.y.create_index()
+            src.create_dict("/group/dict", {"a": np.arange(3), "b": 1})
+            src["/group"].attrs["key"] = "value"
+
+            copy = src.copy_node("/group", dest, "/copy")
+            assert copy.attrs["key"] == "value"
+            carray = dest.root._h5_group.copy.carray
+            assert carray.filters == filters
+            assert carray.chunkshape == src["/group/carray"].chunkshape
+            np.testing.assert_array_equal(carray[:], array)
+            np.testing.assert_array_equal(dest["/copy/earray"][:], array[0])
+            np.testing.assert_array_equal(dest["/copy/plain"][:], [0, 1, 2])
+            table = dest["/copy/table"]
+            assert isinstance(table, H5TableNode)
+            np.testing.assert_array_equal(table["y"], np.arange(50))
+            assert "y" in table._h5_table.colindexes
+            assert isinstance(dest["/copy/dict"], H5DictNode)
+            assert dest["/copy/dict"]["b"] == 1
+
+            # Copy within the same file, without the children of a group.
+            src.copy_node("/group", dest_path="/shallow", recursive=False)
+            assert len(src["/shallow"]) == 0
+            src.copy_node("/group/dict", dest_path="/dict")
+            np.testing.assert_array_equal(src["/dict"]["a"], np.arange(3))
+
+            with self.assertRaises(ValueError):
+                src.copy_node("/group", dest_path="/group/inner")
+            # Copying a node onto itself must not delete it.
+            src.delete_existing = True
+            with self.assertRaises(ValueError):
+                src.copy_node("/group/carray")
+            with self.assertRaises(ValueError):
+                src.copy_node("/group/carray", src, "/group/carray/")
+            np.testing.assert_array_equal(src["/group/carray"][:], array)
+            src.delete_existing = False
+            with self.assertRaises(ValueError):
+                src.copy_node("/group/plain", dest, "/copy/plain")
+
+    def test_merge(self):
+        with temp_h5_file() as h5, temp_h5_file() as other:
+            h5.create_array("/group/a", np.arange(3))
+            other.create_array("/group/b", np.arange(4))
+            other.create_array("/group/sub/c", np.arange(5))
+            other.create_array("/d", np.arange(6))
+
+            h5.merge(other)
+            assert set(h5["/group"].children_names) == {"a", "b", "sub"}
+            np.testing.assert_array_equal(h5["/group/sub/c"][:], np.arange(5))
+            np.testing.assert_array_equal(h5["/d"][:], np.arange(6))
+
+            with self.assertRaises(ValueError):
+                h5.merge(other)
+            h5.delete_existing = True
+            other["/d"][0] = 10
+            h5.merge(other)
+            assert h5["/d"][0] == 10
+
     def test_create_plain_array_with_H5File(self):
         with open_h5file(H5_TEST_FILE, mode="w") as h5:
             h5array = h5.create_array("/array", np.arange(3), chunked=False)
@@ -147,6 +422,139 @@ class FileTestCase(unittest.TestCase):
             np.testing.assert_allclose(h5array, array)
             assert isinstance(h5array, tables.EArray)
 
+    def test_h5filters(self):
+        filters = tables.Filters(complib="zlib", complevel=3)
+        array = np.arange(100.0)
+        with open_h5file(H5_TEST_FILE, mode="w", h5filters=filters) as h5:
+            assert h5.h5filters is filters
+            h5array = h5.create_array("/array", array, chunked=True)
+            assert h5array.filters.complib == "zlib"
+            assert h5array.filters.complevel == 3
+
+            # Nodes created through groups use the filters of the file too.
+            group = h5.create_group("/group")
+            nodes = [
+                group.create_array("array", array, chunked=True),
+                group.create_vlarray("vlarray", np.float64)._h5_vlarray,
+            ]
+            packed = group.create_packed("packed", {"a": array})
+            nodes.append(packed._h5_group._packed_data)
+            sparse = group.create_sparse("sparse", (2, 2), [0], [1], [1.0])
+            nodes.append(sparse._h5_group._sparse_data)
+            for node in nodes:
+                assert node.filters == filters
+
+    def test_create_array_with_filters(self):
+        filters = tables.Filters(complib="zlib", complevel=1)
+        array = np.arange(100.0)
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            for extendable in (False, True):
+                h5array = h5.create_array(
+                    "/array%d" % extendable,
+                    array,
+                    chunked=True,
+                    extendable=extendable,
+                    filters=filters,
+                )
+                assert h5array.filters.complib == "zlib"
+                np.testing.assert_allclose(h5array, array)
+
+            group = h5.create_group("/group")
+            h5array = group.create_array(
+                "array", array, chunked=True, filters=filters
+            )
+            assert h5array.filters.complib == "zlib"
+
+    def test_create_array_with_access(self):
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            h5array = h5.create_array(
+                "/rows", (1000, 10), dtype="f8", chunked=True, access="rows"
+            )
+            assert h5array.chunkshape == guess_chunkshape(
+                (1000, 10), "f8", "rows"
+            )
+            h5array = h5.create_array(
+                "/columns",
+                np.zeros((10, 100)),
+                extendable=True,
+                access="columns",
+            )
+            assert h5array.chunkshape == guess_chunkshape(
+                (0, 100), "f8", "columns"
+            )
+            # An explicit chunkshape takes precedence.
+            h5array = h5.create_array(
+                "/explicit",
+                (1000, 10),
+                dtype="f8",
+                chunked=True,
+                access="rows",
+                chunkshape=(5, 5),
+            )
+            assert h5array.chunkshape == (5, 5)
+
+    def test_create_array_from_blocks(self):
+        array = np.arange(100.0).reshape(25, 4)
+
+        def blocks():
+            for i in range(0, 25, 10):
+                yield array[i:i + 10]
+
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            h5array = h5.create_array("/earray", blocks())
+            assert isinstance(h5array, tables.EArray)
+            np.testing.assert_allclose(h5array, array)
+
+            h5array = h5.create_array("/carray", blocks(), total_length=25)
+            assert isinstance(h5array, tables.CArray)
+            np.testing.assert_allclose(h5array, array)
+
+            h5array = h5.create_array(
+                "/extendable", blocks(), total_length=25, extendable=True
+            )
+            assert isinstance(h5array, tables.EArray)
+            np.testing.assert_allclose(h5array, array)
+
+            h5array = h5.create_array(
+                "/converted", (b.tolist() for b in blocks()), dtype="f4"
+            )
+            assert h5array.dtype == np.float32
+            np.testing.assert_allclose(h5array, array)
+
+    def test_create_array_from_blocks_errors(self):
+        with open_h5file(H5_TEST_FILE, mode="w") as h5:
+            with self.assertRaises(ValueError):
+                h5.create_array("/empty", iter([]))
+            with self.assertRaises(ValueError):
+                h5.create_array(
+                    "/short", iter([np.zeros(5)]), total_length=10
+                )
+            with self.assertRaises(ValueError):
+                h5.create_array(
+                    "/long", iter([np.zeros(5)] * 3), total_length=10
+                )
+
+            # No partly written nodes are left behind, so a retry works.
+            assert "/short" not in h5
+            assert "/long" not in h5
+            h5array = h5.create_array(
+                "/long", iter([np.zeros(5)] * 2), total_length=10
+            )
+            assert h5array.shape == (10,)
+
+    def test_guess_chunkshape(self):
+        # Rows fill the last axis first.
+        assert guess_chunkshape((1000, 10), "f8", "rows", 800) == (10, 10)
+        assert guess_chunkshape((1000, 200), "f8", "rows", 800) == (1, 100)
+        # Columns fill the first axis first.
+        assert guess_chunkshape((50, 10), "f8", "columns", 800) == (50, 2)
+        assert guess_chunkshape((1000, 10), "f8", "columns", 800) == (100, 1)
+        # An extendable axis is filled as far as the chunk size allows.
+        assert guess_chunkshape((0, 10), "f8", "columns", 800) == (100, 1)
+        assert guess_chunkshape((0, 10), "f8", "rows", 800) == (10, 10)
+        with self.assertRaises(ValueError):
+            guess_chunkshape((10,), "f8", "diagonal")
+
     def test_str_and_repr(self):
         array = np.arange(3)
         with open_h5file(H5_TEST_FILE, mode="w") as h5:
@@ -520,6 +928,21 @@ class FileTestCase(unittest.TestCase):
             assert isinstance(h5["/dict"], H5DictNode)
             assert h5["/dict"]["a"] == 1
 
+    def test_create_dict_with_filters(self):
+        filters = tables.Filters(complib="zlib", complevel=1)
+        with temp_h5_file() as h5:
+            h5dict = h5.create_dict(
+                "/dict",
+                {"a": np.arange(10.0), "b": np.float64(1)},
+                filters=filters,
+            )
+            h5dict["c"] = np.arange(5)
+            group = h5dict._h5_group
+            assert isinstance(group.a, tables.CArray)
+            assert group.a.filters.complib == "zlib"
+            assert isinstance(group.c, tables.CArray)
+            np.testing.assert_allclose(h5["/dict"]["a"], np.arange(10.0))
+
     def test_create_dict_with_H5Group(self):
         node_path = "/bananas/dict"
         data = {"a": 1}
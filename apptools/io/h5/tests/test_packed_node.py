@@ -0,0 +1,124 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import unittest
+
+from apptools._testing.optional_dependencies import (
+    numpy as np,
+    tables,
+    requires_numpy,
+    requires_tables,
+)
+
+if np is not None and tables is not None:
+    from ..packed_node import H5PackedNode
+    from .utils import open_h5file, temp_file, temp_h5_file
+
+
+NODE = "/packed_node"
+
+
+@requires_tables
+@requires_numpy
+class PackedNodeTestCase(unittest.TestCase):
+    def test_create(self):
+        with temp_h5_file() as h5:
+            packed = H5PackedNode.add_to_h5file(h5, NODE, dtype=np.float64)
+            packed["a"] = np.arange(3)
+            packed["b"] = np.arange(5)
+
+            np.testing.assert_allclose(packed["a"], np.arange(3))
+            np.testing.assert_allclose(packed["b"], np.arange(5))
+            assert packed["a"].dtype == np.float64
+            assert len(packed) == 2
+            assert "a" in packed
+            assert list(packed) == ["a", "b"]
+
+    def test_create_with_data(self):
+        data = {
+            "a": np.arange(6).reshape(3, 2),
+            "b": np.zeros((0, 2), dtype=int),
+            "é": np.ones((1, 2), dtype=int),
+        }
+        with temp_file(suffix=".h5") as filename:
+            with open_h5file(filename, mode="w") as h5:
+                packed = h5.create_packed(NODE, data)
+                assert packed.item_shape == (2,)
+                data_node = getattr(packed._h5_group, H5PackedNode._data_node)
+                assert data_node.filters == h5.h5filters
+                assert isinstance(h5[NODE], H5PackedNode)
+
+            with open_h5file(filename, mode="r") as h5:
+                packed = h5[NODE]
+                assert set(packed.keys()) == set(data)
+                for name, array in data.items():
+                    np.testing.assert_array_equal(packed[name], array)
+
+    def test_is_packed_node(self):
+        with temp_h5_file() as h5:
+            packed = h5.create_packed(NODE, dtype=int)
+            assert H5PackedNode.is_packed_node(packed._h5_group)
+            assert H5PackedNode.is_packed_node(h5.root._h5_group.packed_node)
+            group = h5.create_group("/group")
+            assert not H5PackedNode.is_packed_node(group)
+            assert not H5PackedNode.is_packed_node(group._h5_group)
+
+    def test_replace_and_delete(self):
+        with temp_h5_file() as h5:
+            packed = h5.create_packed(NODE, {"a": [1], "b": [2], "c": [3]})
+            packed["b"] = [4, 5]
+            np.testing.assert_array_equal(packed["b"], [4, 5])
+
+            del packed["a"]
+            assert list(packed) == ["b", "c"]
+            packed.update(d=[6], c=[7])
+
+            reopened = h5[NODE]
+            assert set(reopened) == {"b", "c", "d"}
+            np.testing.assert_array_equal(reopened["b"], [4, 5])
+            np.testing.assert_array_equal(reopened["c"], [7])
+            np.testing.assert_array_equal(reopened["d"], [6])
+
+    def test_read_many(self):
+        arrays = {str(i): np.arange(i) for i in range(100)}
+        with temp_h5_file() as h5:
+            packed = h5.create_packed(NODE, arrays, dtype=np.int64)
+            result = packed.read_many(["50", "3", "0", "99"])
+            assert list(result) == ["0", "3", "50", "99"]
+            for name, array in result.items():
+                np.testing.assert_array_equal(array, arrays[name])
+
+            result = packed.read_many()
+            assert len(result) == 100
+            np.testing.assert_array_equal(result["42"], arrays["42"])
+
+    def test_invalid_arrays(self):
+        with temp_h5_file() as h5:
+            packed = h5.create_packed(NODE, dtype=int, item_shape=(2,))
+            with self.assertRaises(ValueError):
+                packed["a"] = np.zeros(2, dtype=int)
+            with self.assertRaises(ValueError):
+                packed["a"] = np.zeros((1, 2))
+            with self.assertRaises(ValueError):
+                packed["a" * 100] = np.zeros((1, 2), dtype=int)
+            assert len(packed) == 0
+
+            with self.assertRaises(ValueError):
+                h5.create_packed("/no_dtype")
+
+    def test_remove_and_copy(self):
+        with temp_h5_file() as h5:
+            h5.create_packed(NODE, {"a": np.arange(3)}, filters=None)
+            h5.copy_node(NODE, dest_path="/copy")
+            np.testing.assert_array_equal(h5["/copy"]["a"], np.arange(3))
+
+            h5.remove_node(NODE)
+            assert NODE not in h5
+            paths = [p for p, _ in h5.iteritems(node_class=H5PackedNode)]
+            assert paths == ["/copy"]
@@ -0,0 +1,72 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import unittest
+
+from apptools._testing.optional_dependencies import (
+    numpy as np,
+    tables,
+    requires_numpy,
+    requires_tables,
+)
+
+if np is not None and tables is not None:
+    from ..reader_pool import H5ReaderPool
+    from .utils import open_h5file, temp_file
+
+
+N_THREADS = 4
+
+
+@requires_numpy
+@requires_tables
+class ReaderPoolTestCase(unittest.TestCase):
+    def test_concurrent_reads(self):
+        arrays = [np.arange(1000.0) * i for i in range(8)]
+        with temp_file(suffix=".h5") as filename:
+            with open_h5file(filename, mode="w") as h5:
+                for i, array in enumerate(arrays):
+                    h5.create_array("/array%d" % i, array, chunked=True)
+
+            barrier = threading.Barrier(N_THREADS)
+
+            def read(i):
+                # Make sure that every worker thread opens a handle.
+                if i < N_THREADS:
+                    barrier.wait()
+                return pool.read("/array%d" % (i % 8), slice(10, 20))
+
+            with H5ReaderPool(filename) as pool:
+                with ThreadPoolExecutor(N_THREADS) as executor:
+                    results = list(executor.map(read, range(40)))
+                assert len(pool) == N_THREADS
+                handles = pool._handles
+
+            for i, result in enumerate(results):
+                np.testing.assert_array_equal(result, arrays[i % 8][10:20])
+            assert not any(h5.is_open for h5 in handles)
+
+    def test_get(self):
+        with temp_file(suffix=".h5") as filename:
+            with open_h5file(filename, mode="w") as h5:
+                h5.create_array("/array", np.arange(3))
+
+            pool = H5ReaderPool(filename, cache_bytes=1024)
+            h5 = pool.get()
+            assert pool.get() is h5
+            assert h5.mode == "r"
+            assert h5.cache is not None
+            np.testing.assert_array_equal(h5["/array"], np.arange(3))
+
+            pool.close()
+            assert not h5.is_open
+            with self.assertRaises(ValueError):
+                pool.get()
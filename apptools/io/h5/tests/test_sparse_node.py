@@ -0,0 +1,124 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import unittest
+
+from apptools._testing.optional_dependencies import (
+    numpy as np,
+    tables,
+    requires_numpy,
+    requires_tables,
+)
+
+if np is not None and tables is not None:
+    from ..sparse_node import H5SparseNode
+    from .utils import open_h5file, temp_file, temp_h5_file
+
+
+NODE = "/sparse_node"
+
+
+def random_sparse(shape, density=0.05):
+    dense = np.random.random(shape)
+    dense[dense > density] = 0
+    rows, cols = np.nonzero(dense)
+    return dense, rows, cols, dense[rows, cols]
+
+
+@requires_tables
+@requires_numpy
+class SparseNodeTestCase(unittest.TestCase):
+    def test_create(self):
+        dense, rows, cols, values = random_sparse((50, 30))
+        # Shuffle the values to check that they are sorted.
+        order = np.random.permutation(len(values))
+        with temp_file(suffix=".h5") as filename:
+            with open_h5file(filename, mode="w") as h5:
+                sparse = h5.create_sparse(
+                    NODE, dense.shape, rows[order], cols[order], values[order]
+                )
+                assert isinstance(sparse, H5SparseNode)
+                assert sparse.nnz == len(values)
+                group = sparse._h5_group
+                assert group._sparse_data.filters == h5.h5filters
+                assert group._sparse_indices.filters == h5.h5filters
+
+            with open_h5file(filename, mode="r") as h5:
+                sparse = h5[NODE]
+                assert isinstance(sparse, H5SparseNode)
+                assert sparse.shape == (50, 30)
+                assert len(sparse) == 50
+                np.testing.assert_array_equal(sparse[:], dense)
+                np.testing.assert_array_equal(sparse[7], dense[7])
+                np.testing.assert_array_equal(sparse[-1], dense[-1])
+                np.testing.assert_array_equal(sparse[10:13], dense[10:13])
+                np.testing.assert_array_equal(
+                    sparse.read_rows(45, 60), dense[45:]
+                )
+
+                data, indices, indptr = sparse.read_csr()
+                assert indices.dtype == np.int32
+                assert len(indptr) == 51
+                np.testing.assert_array_equal(
+                    data[indptr[3]:indptr[4]], dense[3][dense[3] != 0]
+                )
+
+    def test_duplicates_are_summed(self):
+        with temp_h5_file() as h5:
+            sparse = h5.create_sparse(
+                NODE, (2, 3), [1, 0, 1], [2, 0, 2], [1.0, 2.0, 3.0]
+            )
+            assert sparse.nnz == 2
+            np.testing.assert_array_equal(sparse[:], [[2, 0, 0], [0, 0, 4]])
+
+    def test_empty(self):
+        with temp_h5_file() as h5:
+            sparse = h5.create_sparse(NODE, (3, 4), [], [], np.zeros(0))
+            assert sparse.nnz == 0
+            np.testing.assert_array_equal(h5[NODE][:], np.zeros((3, 4)))
+
+    def test_iter_chunks(self):
+        dense, rows, cols, values = random_sparse((100, 20))
+        with temp_h5_file() as h5:
+            group = h5.create_group("/group")
+            sparse = group.create_sparse(
+                "matrix", dense.shape, rows, cols, values
+            )
+            chunks = list(sparse.iter_chunks(chunk_rows=30))
+            assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+            np.testing.assert_array_equal(np.concatenate(chunks), dense)
+            assert len(list(sparse.iter_chunks())) == 1
+
+    def test_invalid(self):
+        with temp_h5_file() as h5:
+            with self.assertRaises(ValueError):
+                h5.create_sparse(NODE, (2, 2), [0, 2], [0, 0], [1, 1])
+            with self.assertRaises(ValueError):
+                h5.create_sparse(NODE, (2, 2), [0, 1], [0], [1, 1])
+            sparse = h5.create_sparse(NODE, (2, 2), [0], [0], [1])
+            with self.assertRaises(ValueError):
+                sparse[::2]
+
+    def test_filters_copy_and_remove(self):
+        dense, rows, cols, values = random_sparse((20, 20))
+        filters = tables.Filters(complevel=5, complib="zlib")
+        with temp_h5_file() as h5:
+            h5.create_sparse(
+                NODE, dense.shape, rows, cols, values, filters=filters
+            )
+            group = h5.root._h5_group.sparse_node
+            assert group._sparse_data.filters == filters
+            assert H5SparseNode.is_sparse_node(group)
+            assert not H5SparseNode.is_sparse_node(h5.root)
+
+            h5.copy_node(NODE, dest_path="/copy")
+            np.testing.assert_array_equal(h5["/copy"][:], dense)
+            h5.remove_node(NODE)
+            paths = [p for p, _ in h5.iteritems(node_class=H5SparseNode)]
+            assert paths == ["/copy"]
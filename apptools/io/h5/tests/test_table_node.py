@@ -7,7 +7,9 @@
 # is also available online at http://www.enthought.com/licenses/BSD.txt
 #
 # Thanks for using Enthought open source!
+import gc
 import unittest
+from unittest import mock
 
 from apptools._testing.optional_dependencies import (
     numpy as np,
@@ -19,8 +21,9 @@ from apptools._testing.optional_dependencies import (
 )
 
 if np is not None and tables is not None:
+    from .. import table_node
     from ..table_node import H5TableNode
-    from .utils import temp_h5_file
+    from .utils import open_h5file, temp_file, temp_h5_file
 
 
 NODE = "/table_node"
@@ -56,6 +59,268 @@ class TableNodeTestCase(unittest.TestCase):
             np.testing.assert_allclose(h5table["a"], (1, 2))
             np.testing.assert_allclose(h5table[["b", "a"]], [(3, 1), (4, 2)])
 
+    def test_append_structured_array(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(h5, NODE, description)
+            records = np.array([(1.5, 3), (2.5, 4)], dtype=description)
+            h5table.append(records)
+            # Field order and dtypes that differ from the table are converted.
+            other = np.array([(5, 6.0)], dtype=[("b", "i8"), ("a", "f4")])
+            h5table.append(other)
+
+            np.testing.assert_allclose(h5table["a"], [1.5, 2.5, 6.0])
+            np.testing.assert_array_equal(h5table["b"], [3, 4, 5])
+
+    def test_append_multidimensional_column(self):
+        description = [("a", np.float64, (2,)), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(h5, NODE, description)
+            h5table.append({"a": [[1, 2], [3, 4]], "b": [5, 6]})
+
+            np.testing.assert_allclose(h5table["a"], [[1, 2], [3, 4]])
+            np.testing.assert_array_equal(h5table["b"], [5, 6])
+
+    def test_append_invalid_data(self):
+        description = [("a", np.float64), ("b", np.float64)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(h5, NODE, description)
+            with self.assertRaises(ValueError):
+                h5table.append(np.zeros(2, dtype=[("a", "f8"), ("c", "f8")]))
+            with self.assertRaises(ValueError):
+                h5table.append(np.zeros(2))
+            with self.assertRaises(ValueError):
+                h5table.append({"a": [1, 2], "b": [3]})
+            with self.assertRaises(ValueError):
+                h5table.append({"a": ["x", "y"], "b": [3, 4]})
+            assert len(h5table) == 0
+
+    def test_read(self):
+        description = [("a", np.float64), ("b", np.int32), ("c", np.int8)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(h5, NODE, description)
+            h5table.append(
+                {"a": np.arange(10), "b": -np.arange(10), "c": np.zeros(10)}
+            )
+
+            np.testing.assert_allclose(h5table.read("a", 2, 5), [2, 3, 4])
+            np.testing.assert_allclose(h5table.read("a", start=7), [7, 8, 9])
+
+            data = h5table.read(["b", "a"], start=1, stop=9, step=3)
+            assert data.dtype.names == ("b", "a")
+            assert data.dtype.itemsize == 12
+            np.testing.assert_array_equal(data["b"], [-1, -4, -7])
+            np.testing.assert_allclose(data["a"], [1, 4, 7])
+
+            data = h5table.read()
+            assert data.dtype.names == ("a", "b", "c")
+            assert len(data) == 10
+
+            for step in (0, -1):
+                with self.assertRaises(ValueError):
+                    h5table.read(["a"], step=step)
+                with self.assertRaises(ValueError):
+                    h5table.read("a", step=step)
+                with self.assertRaises(ValueError):
+                    h5table.where("a > 2", step=step)
+
+    def test_read_columns_in_blocks(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(
+                h5, NODE, description, chunkshape=(4,)
+            )
+            h5table.append({"a": np.arange(10), "b": -np.arange(10)})
+
+            with mock.patch.object(table_node, "READ_BLOCK_BYTES", 1):
+                data = h5table.read(["b"], start=1, step=3)
+                np.testing.assert_array_equal(data["b"], [-1, -4, -7])
+                np.testing.assert_allclose(
+                    h5table[["b", "a"]][-2:], [(-8, 8), (-9, 9)]
+                )
+                assert len(h5table.read(["a"], start=5, stop=2)) == 0
+
+    def test_read_into(self):
+        description = [("a", np.float64), ("b", np.int32, (2,))]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(h5, NODE, description)
+            h5table.append(
+                {"a": np.arange(10), "b": np.arange(20).reshape(10, 2)}
+            )
+
+            out = np.empty(4, dtype=h5table._h5_table.dtype)
+            rows = h5table.read_into(out, 2, 6)
+            assert np.shares_memory(rows, out)
+            np.testing.assert_allclose(out["a"], [2, 3, 4, 5])
+
+            out = np.zeros((4, 2), dtype=np.int32)
+            rows = h5table.read_into(out, start=8, column="b")
+            assert len(rows) == 2
+            np.testing.assert_array_equal(out[:2], [[16, 17], [18, 19]])
+
+            # Other dtypes and byte orders are cast.
+            out = np.zeros(3, dtype=np.float32)
+            h5table.read_into(out, 0, 3, column="a")
+            np.testing.assert_allclose(out, [0, 1, 2])
+            out = np.zeros(3, dtype=">f8")
+            h5table.read_into(out, 0, 3, column="a")
+            np.testing.assert_allclose(out, [0, 1, 2])
+            out = np.zeros(2, dtype=[("a", ">f8"), ("b", ">i4", (2,))])
+            h5table.read_into(out, 1, 3)
+            np.testing.assert_allclose(out["a"], [1, 2])
+            np.testing.assert_array_equal(out["b"], [[2, 3], [4, 5]])
+
+            with self.assertRaises(ValueError):
+                h5table.read_into(np.empty(2), 0, 3, column="a")
+            with self.assertRaises(ValueError):
+                h5table.read_into(np.empty(3), 0, 3, column="b")
+
+    def test_iter_chunks(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(
+                h5, NODE, description, chunkshape=(4,)
+            )
+            h5table.append({"a": np.arange(10), "b": np.arange(10)})
+
+            chunks = list(h5table.iter_chunks("a"))
+            assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+            np.testing.assert_allclose(np.concatenate(chunks), np.arange(10))
+
+            # Block sizes are rounded up to a multiple of the chunkshape.
+            chunks = list(h5table.iter_chunks(["b"], chunk_rows=5))
+            assert [len(chunk) for chunk in chunks] == [8, 2]
+            assert chunks[0].dtype.names == ("b",)
+
+    def test_where(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(h5, NODE, description)
+            h5table.append({"a": np.arange(10), "b": np.arange(10) % 3})
+
+            data = h5table.where("(a > 2) & (b == 0)")
+            assert data.dtype.names == ("a", "b")
+            np.testing.assert_allclose(data["a"], [3, 6, 9])
+
+            np.testing.assert_allclose(
+                h5table.where("b == x", "a", condvars={"x": 1}), [1, 4, 7]
+            )
+            data = h5table.where("a < 5", ["b"], start=2)
+            assert data.dtype.names == ("b",)
+            np.testing.assert_array_equal(data["b"], [2, 0, 1])
+
+    def test_iter_where(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(
+                h5, NODE, description, chunkshape=(4,)
+            )
+            h5table.append({"a": np.arange(20), "b": np.arange(20) % 2})
+
+            chunks = list(h5table.iter_where("b == 0", "a"))
+            assert len(chunks) == 5
+            np.testing.assert_allclose(
+                np.concatenate(chunks), np.arange(0, 20, 2)
+            )
+
+    def test_create_index(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(
+                h5, NODE, description, chunkshape=(4,)
+            )
+            h5table.append({"a": np.arange(20), "b": np.arange(20) % 2})
+
+            assert h5table.create_index("b") == 20
+            assert h5table._h5_table.cols.b.is_indexed
+
+            np.testing.assert_allclose(
+                h5table.where("b == 1", "a"), np.arange(1, 20, 2)
+            )
+            # Queries on indexed columns yield blocks of matching rows.
+            chunks = list(h5table.iter_where("b == 1", ["a"]))
+            assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+            np.testing.assert_allclose(
+                np.concatenate(chunks)["a"], np.arange(1, 20, 2)
+            )
+
+    def test_buffered_append(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(
+                h5, NODE, description, buffer_rows=4
+            )
+            h5table.append({"a": [1, 2], "b": [3, 4]})
+            h5table.append({"a": [3], "b": [5]})
+            # Nothing has been written, but the rows are counted.
+            assert h5table._h5_table.nrows == 0
+            assert len(h5table) == 3
+
+            # Filling the buffer writes it.
+            h5table.append({"a": [4], "b": [6]})
+            assert h5table._h5_table.nrows == 4
+            assert len(h5table) == 4
+
+            # Reads include buffered rows.
+            h5table.append({"a": [5], "b": [7]})
+            np.testing.assert_allclose(h5table["a"], [1, 2, 3, 4, 5])
+            assert h5table._h5_table.nrows == 5
+
+            # Large appends bypass the buffer.
+            h5table.append({"a": np.arange(10), "b": np.arange(10)})
+            assert h5table._h5_table.nrows == 15
+
+            h5table.append({"a": [6], "b": [8]})
+            h5table.flush()
+            assert h5table._h5_table.nrows == 16
+
+    def test_buffered_append_flush_interval(self):
+        description = [("a", np.float64)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(
+                h5, NODE, description, buffer_rows=100, flush_interval=0
+            )
+            h5table.append({"a": [1, 2]})
+            assert h5table._h5_table.nrows == 2
+
+    def test_buffered_append_flushed_on_close(self):
+        description = [("a", np.float64)]
+        with temp_file() as filename:
+            with open_h5file(filename, mode="w") as h5:
+                h5table = h5.create_table(NODE, description, buffer_rows=100)
+                h5table.append({"a": [1, 2, 3]})
+                assert h5table._h5_table.nrows == 0
+
+            with open_h5file(filename, mode="r") as h5:
+                np.testing.assert_allclose(h5[NODE]["a"], [1, 2, 3])
+
+    def test_buffered_append_wrapper_dropped_before_close(self):
+        description = [("a", np.float64)]
+        with temp_file() as filename:
+            with open_h5file(filename, mode="w") as h5:
+                h5table = h5.create_table(NODE, description, buffer_rows=100)
+                h5table.append({"a": [1, 2, 3]})
+                del h5table
+                gc.collect()
+
+            with open_h5file(filename, mode="r") as h5:
+                np.testing.assert_allclose(h5[NODE]["a"], [1, 2, 3])
+
+    def test_buffered_rows_seen_through_file(self):
+        description = [("a", np.float64)]
+        with temp_h5_file() as h5:
+            h5table = h5.create_table(NODE, description, buffer_rows=100)
+            h5table.append({"a": np.arange(5)})
+
+            assert len(h5[NODE]) == 5
+            np.testing.assert_allclose(h5[NODE]["a"], np.arange(5))
+            items = dict(h5.iteritems(node_class=H5TableNode))
+            assert len(items[NODE]) == 5
+
+            h5table.append({"a": [5]})
+            h5.copy_node(NODE, dest_path="/copy")
+            np.testing.assert_allclose(h5["/copy"]["a"], np.arange(6))
+
     def test_keys(self):
         description = [("hello", "int"), ("world", "int"), ("Qux1", "bool")]
         with temp_h5_file() as h5:
@@ -73,6 +338,61 @@ class TableNodeTestCase(unittest.TestCase):
             assert isinstance(df, pandas.DataFrame)
             np.testing.assert_allclose(df["a"], h5table["a"])
 
+    @requires_pandas
+    def test_to_dataframe_columns(self):
+        description = [
+            ("a", np.float64),
+            ("b", np.int32, (2,)),
+            ("c", np.float32, (2, 2)),
+        ]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(
+                h5, NODE, description, chunkshape=(4,)
+            )
+            h5table.append(
+                {
+                    "a": np.arange(10),
+                    "b": np.arange(20).reshape(10, 2),
+                    "c": np.ones((10, 2, 2)),
+                }
+            )
+
+            df = h5table.to_dataframe()
+            assert list(df.columns) == [
+                "a", "b_0", "b_1", "c_0_0", "c_0_1", "c_1_0", "c_1_1"
+            ]
+            np.testing.assert_array_equal(df["b_1"], np.arange(1, 20, 2))
+
+            df = h5table.to_dataframe(["b", "a"], start=2, stop=5)
+            assert list(df.columns) == ["b_0", "b_1", "a"]
+            assert list(df.index) == [2, 3, 4]
+            np.testing.assert_allclose(df["a"], [2, 3, 4])
+
+            # Read in blocks of one chunk.
+            with mock.patch.object(table_node, "READ_BLOCK_BYTES", 1):
+                df = h5table.to_dataframe(["c", "a"], start=1)
+            np.testing.assert_allclose(df["a"], np.arange(1, 10))
+            np.testing.assert_allclose(df["c_1_0"], np.ones(9))
+
+            df = h5table.to_dataframe("a", start=20)
+            assert list(df.columns) == ["a"]
+            assert len(df) == 0
+
+    @requires_pandas
+    def test_to_dataframe_chunks(self):
+        description = [("a", np.float64), ("b", np.int32)]
+        with temp_h5_file() as h5:
+            h5table = H5TableNode.add_to_h5file(
+                h5, NODE, description, buffer_rows=4
+            )
+            h5table.append({"a": np.arange(10), "b": np.arange(10)})
+
+            chunks = list(h5table.to_dataframe("b", start=1, chunksize=4))
+            assert [len(chunk) for chunk in chunks] == [4, 4, 1]
+            assert list(chunks[1].index) == [5, 6, 7, 8]
+            df = pandas.concat(chunks)
+            np.testing.assert_array_equal(df["b"], np.arange(1, 10))
+
 
 if __name__ == "__main__":
     from numpy import testing
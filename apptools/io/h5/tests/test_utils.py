@@ -0,0 +1,83 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import operator
+import unittest
+
+from apptools._testing.optional_dependencies import (
+    numpy as np,
+    tables,
+    requires_numpy,
+    requires_tables,
+)
+
+if np is not None and tables is not None:
+    from ..utils import map_chunks
+    from .utils import open_h5file, temp_file
+
+
+def sum_and_count(block):
+    return np.array([block.sum(), block.size])
+
+
+def shape(block):
+    return block.shape
+
+
+@requires_numpy
+@requires_tables
+class MapChunksTestCase(unittest.TestCase):
+    def test_map_chunks(self):
+        array = np.random.random((1000, 3))
+        with temp_file(suffix=".h5") as filename:
+            with open_h5file(filename, mode="w") as h5:
+                h5.create_array(
+                    "/array", array, chunked=True, chunkshape=(64, 3)
+                )
+                h5.create_group("/group")
+
+            # Blocks are rounded up to whole chunks.
+            maxima = map_chunks(
+                filename, "/array", np.max, workers=2, block_rows=100
+            )
+            assert len(maxima) == 8
+            np.testing.assert_allclose(
+                maxima, [array[i:i + 128].max() for i in range(0, 1000, 128)]
+            )
+
+            total, count = map_chunks(
+                filename, "/array", sum_and_count, reduce=operator.add
+            )
+            assert count == array.size
+            np.testing.assert_allclose(total, array.sum())
+
+            with self.assertRaises(ValueError):
+                map_chunks(filename, "/group", np.max)
+
+    def test_map_chunks_main_dimension(self):
+        array = np.random.random((3, 100))
+        with temp_file(suffix=".h5") as filename:
+            with open_h5file(filename, mode="w") as h5:
+                earray = h5._h5.create_earray(
+                    "/",
+                    "earray",
+                    tables.Float64Atom(),
+                    shape=(3, 0),
+                    chunkshape=(3, 16),
+                )
+                earray.append(array)
+                assert earray.maindim == 1
+
+            shapes = map_chunks(filename, "/earray", shape, block_rows=40)
+            assert shapes == [(3, 48), (3, 48), (3, 4)]
+            total, count = map_chunks(
+                filename, "/earray", sum_and_count, reduce=operator.add
+            )
+            assert count == array.size
+            np.testing.assert_allclose(total, array.sum())
@@ -0,0 +1,112 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import unittest
+
+from apptools._testing.optional_dependencies import (
+    numpy as np,
+    tables,
+    requires_numpy,
+    requires_tables,
+)
+
+if np is not None and tables is not None:
+    from ..vlarray_node import H5VLArrayNode
+    from .utils import open_h5file, temp_file, temp_h5_file
+
+
+NODE = "/vlarray_node"
+
+
+@requires_numpy
+@requires_tables
+class VLArrayNodeTestCase(unittest.TestCase):
+    def test_basics(self):
+        rows = [np.arange(n, dtype=np.int32) for n in (3, 0, 5, 1)]
+        with temp_file(suffix=".h5") as filename:
+            with open_h5file(filename, mode="w") as h5:
+                node = h5.create_vlarray(NODE, np.int32)
+                assert isinstance(node, H5VLArrayNode)
+                node.append(rows[0])
+                node.extend(rows[1:])
+                assert node._h5_vlarray.filters == h5.h5filters
+
+            with open_h5file(filename, mode="r") as h5:
+                node = h5[NODE]
+                assert isinstance(node, H5VLArrayNode)
+                assert len(node) == 4
+                assert node.atom_dtype == np.int32
+                np.testing.assert_array_equal(node[2], rows[2])
+                for row, expected in zip(node[1:3], rows[1:3]):
+                    np.testing.assert_array_equal(row, expected)
+                for row, expected in zip(node, rows):
+                    np.testing.assert_array_equal(row, expected)
+                assert node.read(3, 10)[0].tolist() == [0]
+                assert node.read(4) == []
+
+    def test_flat(self):
+        with temp_h5_file() as h5:
+            node = h5.create_vlarray(NODE, ("f8", (2,)))
+            values = np.arange(12.0).reshape(6, 2)
+            node.extend_flat(values, [2, 0, 4])
+            assert len(node) == 3
+            assert node[2].shape == (4, 2)
+
+            read_values, lengths = node.read_flat()
+            np.testing.assert_array_equal(read_values, values)
+            np.testing.assert_array_equal(lengths, [2, 0, 4])
+
+            read_values, lengths = node.read_flat(1, 2)
+            assert read_values.shape == (0, 2)
+            read_values, lengths = node.read_flat(3)
+            assert read_values.shape == (0, 2)
+
+            with self.assertRaises(ValueError):
+                node.extend_flat(values, [2, 2])
+
+    def test_read_rows(self):
+        rows = [np.full(i % 7, i) for i in range(1000)]
+        with temp_h5_file() as h5:
+            group = h5.create_group("/group")
+            node = group.create_vlarray("rows", np.int64, chunkshape=(64,))
+            node.extend(rows)
+
+            indices = [999, 3, 500, 4, 3, -1]
+            for row, i in zip(node.read_rows(indices), indices):
+                np.testing.assert_array_equal(row, rows[i])
+            for row, i in zip(node[np.array([10, 700])], [10, 700]):
+                np.testing.assert_array_equal(row, rows[i])
+            assert node.read_rows([]) == []
+
+            chunks = list(node.iter_chunks())
+            assert [len(chunk) for chunk in chunks[:2]] == [64, 64]
+            assert sum(len(chunk) for chunk in chunks) == 1000
+
+    def test_wrapping(self):
+        with temp_h5_file() as h5:
+            node = h5.create_vlarray(NODE, np.float64)
+            assert H5VLArrayNode.is_vlarray_node(node)
+            assert H5VLArrayNode.is_vlarray_node(node._h5_vlarray)
+            assert not H5VLArrayNode.is_vlarray_node(h5.root)
+            node.attrs["units"] = "m"
+            assert h5[NODE].attrs["units"] == "m"
+
+            # VLArrays not created as H5VLArrayNode are left as they are.
+            h5._h5.create_vlarray("/", "objects", tables.ObjectAtom())
+            h5.invalidate_index()
+            objects = h5["/objects"]
+            assert isinstance(objects, tables.VLArray)
+            assert not H5VLArrayNode.is_vlarray_node(objects)
+            objects.append({"a": 1})
+            assert objects.nrows == 1
+
+            paths = [p for p, _ in h5.iteritems(node_class=H5VLArrayNode)]
+            assert paths == [NODE]
+            h5.remove_node(NODE)
+            assert NODE not in h5
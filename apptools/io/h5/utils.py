@@ -7,11 +7,22 @@
 # is also available online at http://www.enthought.com/licenses/BSD.txt
 #
 # Thanks for using Enthought open source!
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
+import functools
+
+import tables
 
 from .file import H5File
 
 
+#: Approximate size in bytes of the blocks processed by `map_chunks` tasks.
+TASK_BYTES = 2 ** 24
+
+# The read-only file handle of a `map_chunks` worker process.
+_worker_file = None
+
+
 @contextmanager
 def open_h5file(filename, mode="r+", **kwargs):
     """Context manager for reading an HDF5 file as an H5File object.
@@ -35,3 +46,98 @@ def open_h5file(filename, mode="r+", **kwargs):
         yield h5
     finally:
         h5.close()
+
+
+def map_chunks(
+    filename, node_path, func, reduce=None, workers=None, block_rows=None
+):
+    """Apply a function to the blocks of rows of an array in worker processes.
+
+    The array is split along its main dimension (the first axis, or the
+    extendable axis of an EArray) into blocks of whole chunks, which are
+    processed by a pool of worker processes. Each worker opens its
+    own read-only handle of the file, so the array may be far larger than
+    memory. Any changes to the file must be flushed before calling this.
+
+    Parameters
+    ----------
+    filename : str
+        HDF5 file name.
+    node_path : str
+        Path of an array node; e.g. '/path/to/node'.
+    func : callable
+        Function called with each block, a numpy array. It must be picklable,
+        i.e. defined at the top level of a module.
+    reduce : callable
+        If given, a function of two results which combines the results of
+        all blocks, in the order of the blocks (see `functools.reduce`).
+    workers : int
+        Number of worker processes. Defaults to the number of CPUs.
+    block_rows : int
+        Number of rows in a block, rounded up to a multiple of the chunk
+        length. Defaults to the largest multiple of the chunk length which
+        fits in `TASK_BYTES`.
+
+    Returns
+    -------
+    result : list or object
+        The results of `func` in the order of the blocks, or their
+        combination if `reduce` is given.
+    """
+    with open_h5file(filename, mode="r") as h5:
+        node = h5._h5.get_node(node_path)
+        if not isinstance(node, tables.Array):
+            msg = "{!r} is not an array node."
+            raise ValueError(msg.format(node_path))
+        n_rows = node.shape[node.maindim] if node.shape else 0
+        if block_rows is None:
+            block_rows = _default_block_rows(node)
+        elif node.chunkshape is not None:
+            chunk_rows = node.chunkshape[node.maindim]
+            block_rows = -(-block_rows // chunk_rows) * chunk_rows
+
+    ranges = [
+        (start, min(start + block_rows, n_rows))
+        for start in range(0, n_rows, block_rows)
+    ]
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_open_worker_file,
+        initargs=(filename,),
+    )
+    with executor:
+        results = executor.map(
+            functools.partial(_apply_to_rows, node_path, func), ranges
+        )
+        if reduce is None:
+            return list(results)
+        return functools.reduce(reduce, results)
+
+
+def _default_block_rows(node):
+    """Return the number of rows of the blocks of `map_chunks`, along the
+    main dimension of the array.
+    """
+    maindim = node.maindim
+    row_bytes = node.dtype.itemsize
+    for axis, length in enumerate(node.shape):
+        if axis != maindim:
+            row_bytes *= length
+    rows = max(1, TASK_BYTES // max(1, row_bytes))
+    if node.chunkshape is not None:
+        # Blocks are made of whole chunks, so no chunk is read twice.
+        chunk_rows = node.chunkshape[maindim]
+        rows = max(chunk_rows, rows // chunk_rows * chunk_rows)
+    return rows
+
+
+def _open_worker_file(filename):
+    global _worker_file
+    _worker_file = tables.open_file(filename, mode="r")
+
+
+def _apply_to_rows(node_path, func, row_range):
+    start, stop = row_range
+    node = _worker_file.get_node(node_path)
+    key = (slice(None),) * node.maindim + (slice(start, stop),)
+    return func(node[key])
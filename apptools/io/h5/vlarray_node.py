@@ -0,0 +1,242 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+import numpy as np
+
+from tables import Atom, VLArray as PyTablesVLArray
+
+
+#: Attribute marking the VLArray nodes created by `H5VLArrayNode`. Other
+#: VLArrays (e.g. of Python objects) are left unwrapped.
+NODE_ATTR = "H5_VLARRAY_NODE"
+
+#: Maximum number of unwanted rows between two rows read by `read_rows` in a
+#: single read. A separate read costs about as much as reading 5 rows.
+MAX_READ_GAP = 4
+
+
+class H5VLArrayNode(object):
+    """A wrapper for PyTables VLArray nodes, which store a sequence of
+    arrays of different lengths (e.g. one list of hits per event).
+
+    Each row is an array of the atom dtype. Ranges of rows are read with a
+    single HDF5 read, and appended rows are collected in the chunk cache of
+    HDF5, so they are written in whole chunks.
+
+    Parameters
+    ----------
+    node : tables.VLArray instance
+        An H5 node which is a pytables.VLArray or H5VLArrayNode instance
+    """
+
+    def __init__(self, node):
+        # Avoid a circular import
+        from .file import H5Attrs
+
+        assert self.is_vlarray_node(node)
+        if hasattr(node, "_h5_vlarray"):
+            node = node._h5_vlarray
+        self._h5_vlarray = node
+        self.attrs = H5Attrs(node._v_attrs)
+
+    # --------------------------------------------------------------------------
+    #  Creation methods
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def add_to_h5file(cls, h5, node_path, atom_dtype, **kwargs):
+        """Add variable-length array node to an H5 file at the specified path.
+
+        Parameters
+        ----------
+        h5 : H5File
+            The H5 file where the node will be stored.
+        node_path : str
+            Path to node where data is stored (e.g. '/path/to/my_rows')
+        atom_dtype : numpy dtype
+            The dtype of the items of the rows. A subarray dtype, e.g.
+            `('f8', (3,))`, stores rows of shape (n, 3).
+        **kwargs : dict
+            Additional keyword arguments to pass to
+            pytables.File.create_vlarray, e.g. `filters` or `expectedrows`.
+        """
+        path, name = h5.split_path(node_path)
+        atom = Atom.from_dtype(np.dtype(atom_dtype))
+        node = h5._h5.create_vlarray(path, name, atom, **kwargs)
+        node._v_attrs[NODE_ATTR] = True
+        h5.invalidate_index()
+        return cls(node)
+
+    @classmethod
+    def is_vlarray_node(cls, pytables_node):
+        """Return True if pytables_node is a pytables.VLArray created by
+        `add_to_h5file`, or a H5VLArrayNode.
+        """
+        if isinstance(pytables_node, H5VLArrayNode):
+            return True
+        return (
+            isinstance(pytables_node, PyTablesVLArray)
+            and NODE_ATTR in pytables_node._v_attrs
+        )
+
+    # --------------------------------------------------------------------------
+    #  Public interface
+    # --------------------------------------------------------------------------
+
+    @property
+    def atom_dtype(self):
+        return self._h5_vlarray.atom.dtype
+
+    def append(self, row):
+        """ Add a row to the end of the node. """
+        self._h5_vlarray.append(row)
+
+    def extend(self, rows):
+        """ Add rows from an iterable of arrays to the end of the node. """
+        append = self._h5_vlarray.append
+        for row in rows:
+            append(row)
+
+    def extend_flat(self, values, lengths):
+        """Add rows given as the concatenation of their values and their
+        lengths, e.g. as returned by `read_flat`.
+
+        Parameters
+        ----------
+        values : array
+            The values of the rows, concatenated along the first axis.
+        lengths : array of int
+            The number of values in each row.
+        """
+        values = np.asarray(values)
+        lengths = np.asarray(lengths)
+        if lengths.sum() != len(values):
+            msg = "The lengths add up to {}, but there are {} values."
+            raise ValueError(msg.format(lengths.sum(), len(values)))
+        self.extend(np.split(values, np.cumsum(lengths)[:-1]))
+
+    def flush(self):
+        self._h5_vlarray.flush()
+
+    def read(self, start=None, stop=None):
+        """Return a range of rows, as a list of arrays.
+
+        Parameters
+        ----------
+        start, stop : int
+            The range of rows to read, with the same meaning as for a slice.
+        """
+        start, stop, _ = self._row_range(start, stop)
+        if start >= stop:
+            return []
+        return self._h5_vlarray.read(start, stop)
+
+    def read_flat(self, start=None, stop=None):
+        """Return a range of rows as the concatenation of their values and
+        their lengths.
+
+        This avoids handling an array object per row, e.g. to compute
+        statistics over all values with numpy.
+
+        Parameters
+        ----------
+        start, stop : int
+            The range of rows to read, with the same meaning as for a slice.
+
+        Return
+        ------
+        values : ndarray
+            The values of the rows, concatenated along the first axis.
+        lengths : ndarray
+            The number of values in each row.
+        """
+        rows = self.read(start, stop)
+        lengths = np.array([len(row) for row in rows], dtype=np.int64)
+        if rows:
+            values = np.concatenate(rows)
+        else:
+            atom = self._h5_vlarray.atom
+            values = np.empty((0,) + atom.shape, dtype=atom.dtype.base)
+        return values, lengths
+
+    def read_rows(self, indices):
+        """Return the rows with the given indices, as a list of arrays.
+
+        Rows which are close together are read with a single read, so
+        reading runs of rows is faster than reading each row in turn.
+
+        Parameters
+        ----------
+        indices : sequence of int
+            The row numbers.
+        """
+        n_rows = len(self)
+        indices = [range(n_rows)[i] for i in indices]
+        if not indices:
+            return []
+
+        rows = {}
+        ordered = sorted(set(indices))
+        i = 0
+        while i < len(ordered):
+            start = stop = ordered[i]
+            j = i
+            while j < len(ordered) and ordered[j] - stop <= MAX_READ_GAP + 1:
+                stop = ordered[j]
+                j += 1
+            block = self._h5_vlarray.read(start, stop + 1)
+            for index in ordered[i:j]:
+                rows[index] = block[index - start]
+            i = j
+        return [rows[index] for index in indices]
+
+    def iter_chunks(self, chunk_rows=None):
+        """Iterate over the rows in blocks, as lists of arrays.
+
+        Parameters
+        ----------
+        chunk_rows : int
+            The number of rows per block. By default, a block is a single
+            HDF5 chunk.
+        """
+        if chunk_rows is None:
+            chunk_rows = self._h5_vlarray.chunkshape[0]
+        for start in range(0, len(self), chunk_rows):
+            yield self.read(start, start + chunk_rows)
+
+    def __getitem__(self, key):
+        """Return a row, or a list of rows for a slice or a list of row
+        numbers.
+        """
+        if isinstance(key, (list, np.ndarray)):
+            return self.read_rows(key)
+        return self._h5_vlarray[key]
+
+    def __iter__(self):
+        for rows in self.iter_chunks():
+            for row in rows:
+                yield row
+
+    def __len__(self):
+        return self._h5_vlarray.nrows
+
+    def __repr__(self):
+        return repr(self._h5_vlarray)
+
+    # --------------------------------------------------------------------------
+    #  Private interface
+    # --------------------------------------------------------------------------
+
+    def _f_remove(self):
+        """This is called by H5File whenever a node is removed."""
+        self._h5_vlarray._f_remove()
+
+    def _row_range(self, start, stop):
+        """ Return slice-style row range arguments as explicit integers. """
+        return slice(start, stop).indices(self._h5_vlarray.nrows)
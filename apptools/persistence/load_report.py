@@ -0,0 +1,138 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+# Standard library imports
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class LoadReport(object):
+    """Collects timings and statistics while projects are loaded and upgraded.
+
+    Pass an instance as the `report` argument of `load_project`,
+    `upgrade_project` or `VersionedUnpickler`. Time is broken down into the
+    following phases, each measured exclusively of the others:
+
+        'read'       : reading from the pickle files
+        'unpickle'   : rebuilding objects, excluding the other phases
+        'setstate'   : running the updaters' `__setstate__` functions
+        'initialize' : running the objects' `__initialize__` generators
+        'write'      : pickling and writing upgraded files
+
+    The phases are recorded per step, where a step is either 'metadata',
+    'update<N>' for the upgrade to version N or 'load' for the final load.
+
+    Subclasses can override `add_time` and `count_objects` to forward the
+    measurements elsewhere, e.g. to a logger or a profiling UI.
+    """
+
+    def __init__(self):
+        #: Mapping of step name -> {phase name: seconds}.
+        self.steps = {}
+
+        #: Mapping of step name -> Counter of "module.Class" names of the
+        #: unpickled objects which had state.
+        self.object_counts = {}
+
+        #: Total number of bytes read from and written to pickle files.
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+        #: The name of the current step.
+        self.step = None
+
+        # Stack of the time spent in nested phases, one entry per open phase.
+        self._nested_times = []
+
+    def begin_step(self, step):
+        """ Start recording measurements for the given step. """
+        self.step = step
+        self.steps.setdefault(step, {})
+        self.object_counts.setdefault(step, Counter())
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager timing a phase of the current step.
+
+        Time spent in nested phases is only attributed to the innermost one.
+        """
+        self._nested_times.append(0.0)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            nested = self._nested_times.pop()
+            self.add_time(name, elapsed - nested)
+            if self._nested_times:
+                self._nested_times[-1] += elapsed
+
+    def add_time(self, phase, seconds):
+        """ Record `seconds` spent in `phase` during the current step. """
+        times = self.steps.setdefault(self.step, {})
+        times[phase] = times.get(phase, 0.0) + seconds
+
+    def count_objects(self, objects):
+        """ Record the classes of unpickled objects for the current step. """
+        counts = self.object_counts.setdefault(self.step, Counter())
+        counts.update(
+            "%s.%s" % (type(obj).__module__, type(obj).__name__)
+            for obj in objects
+        )
+
+    def phase_totals(self):
+        """ Return a {phase name: seconds} dict summed over all steps. """
+        totals = {}
+        for times in self.steps.values():
+            for phase, seconds in times.items():
+                totals[phase] = totals.get(phase, 0.0) + seconds
+        return totals
+
+    def summary(self):
+        """ Return a human readable summary of the measurements. """
+        lines = []
+        for step, times in self.steps.items():
+            total = sum(times.values())
+            lines.append("%s: %.3fs" % (step, total))
+            for phase, seconds in sorted(times.items()):
+                lines.append("    %-10s %.3fs" % (phase, seconds))
+            counts = self.object_counts.get(step)
+            if counts:
+                lines.append("    objects:")
+                for class_name, count in counts.most_common():
+                    lines.append("        %8d %s" % (count, class_name))
+        lines.append("bytes read: %d" % self.bytes_read)
+        lines.append("bytes written: %d" % self.bytes_written)
+        return "\n".join(lines)
+
+
+class InstrumentedFile(object):
+    """A file wrapper which reports the time and bytes of reads and writes.
+    """
+
+    def __init__(self, file, report):
+        self._file = file
+        self._report = report
+
+    def read(self, *args):
+        with self._report.phase("read"):
+            data = self._file.read(*args)
+        self._report.bytes_read += len(data)
+        return data
+
+    def readline(self, *args):
+        with self._report.phase("read"):
+            data = self._file.readline(*args)
+        self._report.bytes_read += len(data)
+        return data
+
+    def write(self, data):
+        self._report.bytes_written += len(data)
+        return self._file.write(data)
@@ -8,29 +8,53 @@
 #
 # Thanks for using Enthought open source!
 # Standard library imports
+from collections import namedtuple
+from concurrent.futures import as_completed, ProcessPoolExecutor
+import io
 import sys
 import pickle
 import logging
 
 # Enthought library imports
+from apptools.persistence.load_report import InstrumentedFile
 from apptools.persistence.versioned_unpickler import VersionedUnpickler
 
 
 logger = logging.getLogger(__name__)
 
 
+#: The outcome of loading a single project with `load_projects`. Exactly one
+#: of `project` and `error` is not None.
+ProjectLoadResult = namedtuple(
+    "ProjectLoadResult", ["filename", "project", "error"]
+)
+
+
 def load_project(
-    pickle_filename, updater_path, application_version, protocol, max_pass=-1
+    pickle_filename,
+    updater_path,
+    application_version,
+    protocol,
+    max_pass=-1,
+    report=None,
+    dry_run=False,
 ):
     """Reads a project from a pickle file and if necessary will update it to
     the latest version of the application.
+
+    If a `LoadReport` is given as `report`, timings and statistics for each
+    step of the load and upgrade are recorded in it. If `dry_run` is True,
+    the upgraded versions of the project are kept in memory rather than
+    written to disk.
     """
 
     latest_file = pickle_filename
 
     # Read the pickled project's metadata.
+    if report is not None:
+        report.begin_step("metadata")
     f = open(latest_file, "rb")
-    metadata = VersionedUnpickler(f).load(max_pass)
+    metadata = VersionedUnpickler(f, report=report).load(max_pass)
     f.close()
     project_version = metadata.get("version", False)
 
@@ -44,19 +68,23 @@ def load_project(
 
     # here you can temporarily force an upgrade each time for testing ....
     # project_version = 0
-    latest_file = upgrade_project(
+    latest_file, written = _upgrade_project(
         pickle_filename,
         updater_path,
         project_version,
         application_version,
         protocol,
         max_pass,
+        report,
+        dry_run,
     )
 
     # Finally we can import the project ...
     logger.info("loading %s" % latest_file)
-    i_f = open(latest_file, "rb")
-    project = VersionedUnpickler(i_f).load(max_pass)
+    if report is not None:
+        report.begin_step("load")
+    i_f = _open_for_reading(latest_file, written)
+    project = VersionedUnpickler(i_f, report=report).load(max_pass)
     i_f.close()
 
     return project
@@ -69,6 +97,8 @@ def upgrade_project(
     application_version,
     protocol,
     max_pass=-1,
+    report=None,
+    dry_run=False,
 ):
     """Repeatedly read and write the project to disk updating it one version
     at a time.
@@ -82,23 +112,60 @@ def upgrade_project(
     p5.project.v3 ---> loaded into app
 
     The user then has the option to save the updated project as p5.project
+
+    If a `LoadReport` is given as `report`, timings and statistics for each
+    version step are recorded in it. If `dry_run` is True, nothing is
+    written to disk (not even the .bak file) and the name of the file that
+    would have been loaded is returned.
+    """
+    latest_file, _ = _upgrade_project(
+        pickle_filename,
+        updater_path,
+        project_version,
+        application_version,
+        protocol,
+        max_pass,
+        report,
+        dry_run,
+    )
+    return latest_file
+
+
+def _upgrade_project(
+    pickle_filename,
+    updater_path,
+    project_version,
+    application_version,
+    protocol,
+    max_pass,
+    report,
+    dry_run,
+):
+    """Implementation of `upgrade_project`.
+
+    Returns the name of the latest file and a dict mapping the names of the
+    files that were kept in memory (only in a dry run) to their contents.
     """
     first_time = True
     latest_file = pickle_filename
+    written = {}
 
     # update the project until it's version matches the application's
     while project_version < application_version:
 
         next_version = project_version + 1
+        if report is not None:
+            report.begin_step("update%d" % next_version)
 
         if first_time:
             i_f = open(pickle_filename, "rb")
-            data = i_f.read()
-            open("%s.bak" % pickle_filename, "wb").write(data)
-            i_f.seek(0)  # rewind the file to the start
+            if not dry_run:
+                data = i_f.read()
+                open("%s.bak" % pickle_filename, "wb").write(data)
+                i_f.seek(0)  # rewind the file to the start
         else:
             name = "%s.v%d" % (pickle_filename, project_version)
-            i_f = open(name, "rb")
+            i_f = _open_for_reading(name, written)
             latest_file = name
 
         logger.info("converting %s" % latest_file)
@@ -111,7 +178,7 @@ def upgrade_project(
         updater = klass()
 
         # load and update this version of the project
-        project = VersionedUnpickler(i_f, updater).load(max_pass)
+        project = VersionedUnpickler(i_f, updater, report).load(max_pass)
         i_f.close()
 
         # set the project version to be the same as the updater we just
@@ -121,13 +188,101 @@ def upgrade_project(
         # Persist the updated project ...
         name = "%s.v%d" % (pickle_filename, next_version)
         latest_file = name
-        o_f = open(name, "wb")
-        pickle.dump(project.metadata, o_f, protocol=protocol)
-        pickle.dump(project, o_f, protocol=protocol)
+        o_f = io.BytesIO() if dry_run else open(name, "wb")
+        if report is not None:
+            with report.phase("write"):
+                out = InstrumentedFile(o_f, report)
+                pickle.dump(project.metadata, out, protocol=protocol)
+                pickle.dump(project, out, protocol=protocol)
+        else:
+            pickle.dump(project.metadata, o_f, protocol=protocol)
+            pickle.dump(project, o_f, protocol=protocol)
+        if dry_run:
+            written[name] = o_f.getvalue()
         o_f.close()
 
         # Bump up the version number of the pickled project...
         project_version += 1
         first_time = False
 
-    return latest_file
+    return latest_file, written
+
+
+def _open_for_reading(filename, written):
+    """ Open a file written by `_upgrade_project`, possibly in memory. """
+    if filename in written:
+        # Each version is only read once, so don't hold on to it.
+        return io.BytesIO(written.pop(filename))
+    return open(filename, "rb")
+
+
+def load_projects(
+    pickle_filenames,
+    updater_path,
+    application_version,
+    protocol=None,
+    max_pass=-1,
+    workers=None,
+):
+    """Load several projects concurrently, upgrading them as necessary.
+
+    Each file is read with `load_project` in a separate worker process.
+    Processes are used rather than threads because the unpickling machinery
+    patches shared state (the pickle dispatch table and the `__setstate__`
+    methods of upgraded classes) while it runs.
+
+    Results are yielded as they complete, so the order generally differs from
+    the order of `pickle_filenames`. An error raised while loading one file
+    is captured in its result and does not abort the rest of the batch.
+
+    Parameters
+    ----------
+    pickle_filenames : iterable of str
+        The project files to load.
+    updater_path : str
+        Dotted path of the package containing the `updateN` modules.
+    application_version : int
+        The version that projects will be upgraded to.
+    protocol : int, optional
+        Pickle protocol used when writing upgraded files. By default the
+        pickle module's default protocol is used.
+    max_pass : int, optional
+        Maximum number of `__initialize__` passes; see `load_project`.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Yields
+    ------
+    result : ProjectLoadResult
+        The filename together with the loaded project or the exception
+        raised while loading it.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers)
+    futures = {}
+    try:
+        futures = {
+            executor.submit(
+                load_project,
+                filename,
+                updater_path,
+                application_version,
+                protocol,
+                max_pass,
+            ): filename
+            for filename in pickle_filenames
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                project = future.result()
+            except Exception as error:
+                logger.exception("Failed to load %s" % filename)
+                yield ProjectLoadResult(filename, None, error)
+            else:
+                yield ProjectLoadResult(filename, project, None)
+    finally:
+        # Don't keep loading files nobody is waiting for if the caller stops
+        # iterating early.
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
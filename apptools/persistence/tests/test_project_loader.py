@@ -0,0 +1,201 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Tests for the project loading functions. """
+
+# Standard library imports.
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+
+# Enthought library imports
+from apptools.persistence.load_report import LoadReport
+from apptools.persistence.project_loader import (
+    load_project,
+    load_projects,
+    ProjectLoadResult,
+    upgrade_project,
+)
+
+
+UPDATER_PACKAGE = "_project_loader_test_updaters"
+
+UPDATE2_SOURCE = """
+from apptools.persistence.updater import Updater
+
+
+def update_item(self, state):
+    state["value"] = -state["value"]
+    return state
+
+
+class Update2(Updater):
+    def __init__(self):
+        self.refactorings = {}
+        self.setstates = {
+            ("apptools.persistence.tests.test_project_loader", "Item"):
+                update_item,
+        }
+"""
+
+
+class Item:
+    def __init__(self, value):
+        self.value = value
+
+
+class Project:
+    """ A project which pickles its metadata along with its items. """
+
+    def __init__(self, n_items):
+        self.metadata = {"version": 1}
+        self.items = [Item(i) for i in range(n_items)]
+
+    def get(self, key, default=None):
+        return self.metadata.get(key, default)
+
+
+class LoadProjectsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write_project(self, name, version=1):
+        filename = os.path.join(self.tmpdir, name)
+        with open(filename, "wb") as f:
+            pickle.dump({"version": version, "name": name}, f)
+        return filename
+
+    def test_load_projects(self):
+        filenames = [self._write_project("p%d" % i) for i in range(5)]
+
+        results = list(load_projects(filenames, "unused", 1, workers=2))
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual({r.filename for r in results}, set(filenames))
+        for result in results:
+            self.assertIsInstance(result, ProjectLoadResult)
+            self.assertIsNone(result.error)
+            expected = load_project(result.filename, "unused", 1, None)
+            self.assertEqual(result.project, expected)
+
+    def test_errors_are_captured(self):
+        good = self._write_project("good")
+        missing = os.path.join(self.tmpdir, "missing")
+        no_version = self._write_project("no_version", version=0)
+
+        results = {
+            r.filename: r
+            for r in load_projects([good, missing, no_version], "unused", 1)
+        }
+
+        self.assertIsNone(results[good].error)
+        self.assertEqual(results[good].project["name"], "good")
+        self.assertIsInstance(results[missing].error, FileNotFoundError)
+        self.assertIsNone(results[missing].project)
+        self.assertIsInstance(results[no_version].error, ValueError)
+
+    def test_stop_iterating_early(self):
+        filenames = [self._write_project("p%d" % i) for i in range(10)]
+
+        results = load_projects(filenames, "unused", 1, workers=1)
+        first = next(results)
+        results.close()
+
+        self.assertIn(first.filename, filenames)
+
+
+class LoadReportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        package_dir = os.path.join(self.tmpdir, UPDATER_PACKAGE)
+        os.mkdir(package_dir)
+        open(os.path.join(package_dir, "__init__.py"), "w").close()
+        with open(os.path.join(package_dir, "update2.py"), "w") as f:
+            f.write(textwrap.dedent(UPDATE2_SOURCE))
+        sys.path.insert(0, self.tmpdir)
+
+        self.filename = os.path.join(self.tmpdir, "test.project")
+        with open(self.filename, "wb") as f:
+            pickle.dump(Project(10), f)
+
+    def tearDown(self):
+        self._remove_updaters()
+        sys.path.remove(self.tmpdir)
+        for name in list(sys.modules):
+            if name.startswith(UPDATER_PACKAGE):
+                del sys.modules[name]
+        shutil.rmtree(self.tmpdir)
+
+    def _remove_updaters(self):
+        # VersionedUnpickler leaves the updater hooked into the class.
+        for name in ("__setstate__", "__updater__"):
+            if name in vars(Item):
+                delattr(Item, name)
+
+    def test_report_without_upgrade(self):
+        report = LoadReport()
+
+        project = load_project(
+            self.filename, UPDATER_PACKAGE, 1, 2, report=report
+        )
+
+        self.assertIsInstance(project, Project)
+        self.assertEqual(list(report.steps), ["metadata", "load"])
+        self.assertEqual(
+            report.object_counts["load"][__name__ + ".Item"], 10
+        )
+        self.assertEqual(
+            report.bytes_read, 2 * os.path.getsize(self.filename)
+        )
+        self.assertEqual(report.bytes_written, 0)
+        self.assertIn("load:", report.summary())
+
+    def test_report_with_upgrade(self):
+        report = LoadReport()
+
+        latest_file = upgrade_project(
+            self.filename, UPDATER_PACKAGE, 1, 2, 2, report=report
+        )
+
+        self.assertEqual(latest_file, self.filename + ".v2")
+        self.assertEqual(list(report.steps), ["update2"])
+        times = report.steps["update2"]
+        for phase in ("read", "unpickle", "setstate", "initialize", "write"):
+            self.assertGreaterEqual(times[phase], 0.0)
+        counts = report.object_counts["update2"]
+        self.assertEqual(counts[__name__ + ".Item"], 10)
+        self.assertEqual(report.bytes_written, os.path.getsize(latest_file))
+
+        self._remove_updaters()
+        with open(latest_file, "rb") as f:
+            pickle.load(f)
+            project = pickle.load(f)
+        values = [item.value for item in project.items]
+        self.assertEqual(values, [-i for i in range(10)])
+
+    def test_dry_run(self):
+        report = LoadReport()
+
+        metadata = load_project(
+            self.filename, UPDATER_PACKAGE, 2, 2, report=report, dry_run=True
+        )
+
+        self.assertEqual(metadata["version"], 2)
+        self.assertEqual(
+            sorted(os.listdir(self.tmpdir)), [UPDATER_PACKAGE, "test.project"]
+        )
+        self.assertGreater(report.bytes_written, 0)
+        self.assertEqual(list(report.steps), ["metadata", "update2", "load"])
@@ -0,0 +1,85 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Tests for the name resolution of the Updater class. """
+
+# Standard library imports.
+import io
+import pickle
+import unittest
+
+# Enthought library imports
+from apptools.persistence.updater import Updater
+from apptools.persistence.versioned_unpickler import VersionedUnpickler
+from apptools.persistence.tests.state_function_classes import Foo
+
+
+class RenamingUpdater(Updater):
+    def __init__(self):
+        self.refactorings = {
+            ("old.pkg.sub", "Special"): ("other", "Special2"),
+        }
+        self.module_renames = {
+            "old.pkg": "new.pkg",
+            "old.pkg.moved": "elsewhere",
+            "old_apptools": "apptools",
+        }
+        self.setstates = {}
+
+
+class UpdaterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.updater = RenamingUpdater()
+
+    def test_no_mappings(self):
+        updater = Updater()
+        self.assertEqual(updater.get_latest("a.b", "C"), ("a.b", "C"))
+
+    def test_exact_refactoring_wins(self):
+        self.assertEqual(
+            self.updater.get_latest("old.pkg.sub", "Special"),
+            ("other", "Special2"),
+        )
+
+    def test_module_rename(self):
+        get_latest = self.updater.get_latest
+        self.assertEqual(get_latest("old.pkg", "A"), ("new.pkg", "A"))
+        self.assertEqual(
+            get_latest("old.pkg.sub.deep", "A"), ("new.pkg.sub.deep", "A")
+        )
+        # Only whole package names match.
+        self.assertEqual(get_latest("old.pkgfoo", "A"), ("old.pkgfoo", "A"))
+        self.assertEqual(get_latest("old", "A"), ("old", "A"))
+
+    def test_longest_prefix_wins(self):
+        self.assertEqual(
+            self.updater.get_latest("old.pkg.moved.x", "A"),
+            ("elsewhere.x", "A"),
+        )
+
+    def test_strips_carriage_return(self):
+        self.assertEqual(
+            self.updater.get_latest("old.pkg\r", "A\r"), ("new.pkg", "A")
+        )
+
+    def test_results_are_memoized(self):
+        first = self.updater.get_latest("old.pkg.sub", "A")
+        self.updater.module_renames["old.pkg"] = "changed"
+        self.assertEqual(self.updater.get_latest("old.pkg.sub", "A"), first)
+
+    def test_unpickle_renamed_module(self):
+        data = pickle.dumps(Foo(), 2).replace(
+            Foo.__module__.encode("ascii"),
+            ("old_" + Foo.__module__).encode("ascii"),
+        )
+        test_file = io.BytesIO(data)
+
+        obj = VersionedUnpickler(test_file, updater=self.updater).load()
+
+        self.assertIsInstance(obj, Foo)
@@ -17,23 +17,40 @@ def __replacement_setstate__(self, state):
 
 class Updater:
 
-    """An abstract class to provide functionality common to the updaters."""
+    """An abstract class to provide functionality common to the updaters.
+
+    Subclasses describe how names changed between two versions with the
+    following optional attributes:
+
+    refactorings : dict
+        Maps exact (old module, old name) pairs to (new module, new name)
+        pairs.
+    module_renames : dict
+        Maps old module or package names to new ones. A rule also applies to
+        all submodules of the old name, so {"old.pkg": "new.pkg"} maps
+        ("old.pkg.sub", "Foo") to ("new.pkg.sub", "Foo"). The longest
+        matching prefix wins, and exact `refactorings` entries take
+        precedence over these rules.
+
+    Results are memoized per updater, so both mappings must be complete
+    before the first lookup.
+    """
 
     def get_latest(self, module, name):
         """The refactorings dictionary contains mappings between old and new
         module names.  Since we only bump the version number one increment
         there is only one possible answer.
         """
-        if hasattr(self, "refactorings"):
-            module = self.strip(module)
-            name = self.strip(name)
-            # returns the new module and name if it exists otherwise defaults
-            # to using the original module and name
-            module, name = self.refactorings.get(
-                (module, name), (module, name)
-            )
+        # Not initialized in __init__ as subclasses don't call it.
+        cache = self.__dict__.setdefault("_latest_cache", {})
+        try:
+            return cache[(module, name)]
+        except KeyError:
+            pass
 
-        return module, name
+        latest = self._resolve(self.strip(module), self.strip(name))
+        cache[(module, name)] = latest
+        return latest
 
     def strip(self, string):
         # Who would have thought that pickle would pass us
@@ -43,3 +60,22 @@ class Updater:
             return string[:-1]
 
         return string
+
+    def _resolve(self, module, name):
+        """ Return the new (module, name) pair for a stripped old pair. """
+        refactorings = getattr(self, "refactorings", {})
+        if (module, name) in refactorings:
+            return refactorings[(module, name)]
+
+        module_renames = getattr(self, "module_renames", {})
+        if module_renames:
+            # Try the module itself, then each of its parent packages.
+            prefix = module
+            while prefix:
+                if prefix in module_renames:
+                    suffix = module[len(prefix):]
+                    return module_renames[prefix] + suffix, name
+                prefix = prefix.rpartition(".")[0]
+
+        # Default to using the original module and name.
+        return module, name
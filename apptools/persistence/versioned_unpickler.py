@@ -14,6 +14,7 @@ import logging
 from types import GeneratorType
 
 # Enthought library imports
+from apptools.persistence.load_report import InstrumentedFile
 from apptools.persistence.updater import __replacement_setstate__
 
 
@@ -30,6 +31,9 @@ class NewUnpickler(Unpickler):
     the same pickle.
     """
 
+    #: An optional LoadReport which collects timings and statistics.
+    report = None
+
     def load(self, max_pass=-1):
         """Read a pickled object representation from the open file.
 
@@ -43,8 +47,16 @@ class NewUnpickler(Unpickler):
         dispatch[BUILD[0]] = NewUnpickler.load_build
 
         # call the super class' method.
-        ret = Unpickler.load(self)
-        self.initialize(max_pass)
+        report = self.report
+        if report is None:
+            ret = Unpickler.load(self)
+            self.initialize(max_pass)
+        else:
+            with report.phase("unpickle"):
+                ret = Unpickler.load(self)
+            report.count_objects(self.objects)
+            with report.phase("initialize"):
+                self.initialize(max_pass)
         self.objects = []
 
         # Reset the Unpickler's dispatch table.
@@ -116,11 +128,17 @@ class VersionedUnpickler(NewUnpickler):
 
     This ensures that the VersionedUnpickler can remain ignorant about the
     actual version numbers - all it needs to do is upgrade one release.
+
+    If a `LoadReport` is given as `report`, the time spent reading, unpickling,
+    updating and initializing objects is recorded in it.
     """
 
-    def __init__(self, file, updater=None):
+    def __init__(self, file, updater=None, report=None):
+        if report is not None:
+            file = InstrumentedFile(file, report)
         Unpickler.__init__(self, file)
         self.updater = updater
+        self.report = report
 
     def find_class(self, module, name):
         """Overridden method from Unpickler.
@@ -166,6 +184,9 @@ class VersionedUnpickler(NewUnpickler):
         fn = self.updater.setstates.get((module, name), False)
 
         if fn:
+            if self.report is not None:
+                fn = _timed_updater(fn, self.report)
+
             # move the existing __setstate__ out of the way
             self.backup_setstate(module, klass)
 
@@ -211,3 +232,13 @@ class VersionedUnpickler(NewUnpickler):
         """
         module = __import__(module, globals(), locals(), [name])
         return vars(module)[name]
+
+
+def _timed_updater(fn, report):
+    """ Wrap a `__setstate__` updater function to report its run time. """
+
+    def updater(obj, state):
+        with report.phase("setstate"):
+            return fn(obj, state)
+
+    return updater
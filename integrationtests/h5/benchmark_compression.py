@@ -0,0 +1,74 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+# Compare write time, read time and file size of a float array stored
+# without compression and with the zlib and blosc compressors.
+#
+# Usage: python benchmark_compression.py [n_rows] [n_columns]
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import tables
+
+from apptools.io.h5.utils import open_h5file
+
+
+FILTERS = [
+    ('none', tables.Filters()),
+    ('zlib', tables.Filters(complib='zlib', complevel=5)),
+    ('blosc', tables.Filters(complib='blosc', complevel=5, shuffle=False)),
+    # The default filters of H5File.
+    ('blosc+shuffle', None),
+]
+
+
+def make_data(n_rows, n_columns):
+    # Noisy signals sampled by a 12 bit converter, stored as floats.
+    t = np.linspace(0, 100, n_rows)[:, np.newaxis]
+    data = np.sin(t * np.arange(1, n_columns + 1))
+    data += 0.01 * np.random.standard_normal(data.shape)
+    return np.round(data * 2047.0)
+
+
+def benchmark(data, filters):
+    fd, filename = tempfile.mkstemp(suffix='.h5')
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        with open_h5file(filename, mode='w') as h5:
+            h5.create_array('/data', data, chunked=True, filters=filters,
+                            access='rows')
+        write_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        with open_h5file(filename, mode='r') as h5:
+            h5['/data'][:]
+        read_time = time.perf_counter() - t0
+
+        return write_time, read_time, os.path.getsize(filename)
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    n_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    data = make_data(n_rows, n_columns)
+    print('%-14s %10s %10s %12s' % ('filters', 'write', 'read', 'size'))
+    for label, filters in FILTERS:
+        write_time, read_time, size = benchmark(data, filters)
+        print('%-14s %9.3fs %9.3fs %10.1fMB' % (
+            label, write_time, read_time, size / 2**20
+        ))
@@ -0,0 +1,65 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+# Compare write and read times of H5DictNode data stored as a JSON filenode
+# and in the compact binary format.
+#
+# Usage: python benchmark_dict_metadata.py [n_keys]
+
+import os
+import sys
+import tempfile
+import time
+
+from apptools.io.h5.dict_node import H5DictNode
+from apptools.io.h5.utils import open_h5file
+
+
+def make_data(n_keys):
+    return {
+        'key%d' % i: {
+            'name': 'item %d' % i,
+            'values': [i * 0.5, i * 1.5, i * 2.5],
+            'enabled': bool(i % 2),
+            'count': i,
+        }
+        for i in range(n_keys)
+    }
+
+
+def benchmark(data, binary, repeat=5):
+    fd, filename = tempfile.mkstemp(suffix='.h5')
+    os.close(fd)
+    try:
+        with open_h5file(filename, mode='w') as h5:
+            h5dict = h5.create_dict('/dict', binary_metadata=binary)
+            h5dict.data = data
+
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                h5dict.flush()
+            write = (time.perf_counter() - t0) / repeat
+
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                H5DictNode.from_h5file(h5, '/dict')
+            read = (time.perf_counter() - t0) / repeat
+        return write, read
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    n_keys = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    data = make_data(n_keys)
+    for label, binary in [('json', False), ('binary', True)]:
+        write, read = benchmark(data, binary)
+        print('%-6s: write %.3fs, read %.3fs' % (label, write, read))
@@ -0,0 +1,58 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+# Time a chunked min/max/mean reduction with `map_chunks` for increasing
+# numbers of worker processes.
+#
+# Usage: python benchmark_map_chunks.py [n_rows]
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from apptools.io.h5.utils import map_chunks, open_h5file
+
+
+def stats(block):
+    return np.array([block.min(), block.max(), block.sum(), block.size])
+
+
+def combine(a, b):
+    return np.array([min(a[0], b[0]), max(a[1], b[1]), a[2] + b[2],
+                     a[3] + b[3]])
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000000
+    n_rows -= n_rows % 100000
+
+    fd, filename = tempfile.mkstemp(suffix='.h5')
+    os.close(fd)
+    try:
+        with open_h5file(filename, mode='w') as h5:
+            blocks = (np.random.random((100000, 16))
+                      for _ in range(n_rows // 100000))
+            h5.create_array('/data', blocks, total_length=n_rows)
+
+        workers = 1
+        while workers <= os.cpu_count():
+            t0 = time.perf_counter()
+            result = map_chunks(filename, '/data', stats, reduce=combine,
+                                workers=workers)
+            elapsed = time.perf_counter() - t0
+            print('workers=%-3d: %.3fs (mean %.4f)' % (
+                workers, elapsed, result[2] / result[3]
+            ))
+            workers *= 2
+    finally:
+        os.remove(filename)
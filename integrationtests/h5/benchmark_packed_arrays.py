@@ -0,0 +1,89 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+# Compare storing many small arrays as one node per array with storing them
+# in an H5PackedNode: creation time, lookup time and file size.
+#
+# Usage: python benchmark_packed_arrays.py [n_arrays]
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from apptools.io.h5.utils import open_h5file
+
+
+N_LOOKUPS = 2000
+
+
+def make_arrays(n_arrays):
+    lengths = np.random.randint(1, 50, size=n_arrays)
+    return {'array%d' % i: np.random.random(n) for i, n in enumerate(lengths)}
+
+
+def one_node_per_array(filename, arrays, names):
+    t0 = time.perf_counter()
+    with open_h5file(filename, mode='w') as h5:
+        for name, array in arrays.items():
+            h5.create_array('/arrays/' + name, array)
+    created = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with open_h5file(filename, mode='r') as h5:
+        for name in names:
+            h5['/arrays/' + name][:]
+    looked_up = time.perf_counter() - t0
+    return created, looked_up
+
+
+def packed_node(filename, arrays, names):
+    t0 = time.perf_counter()
+    with open_h5file(filename, mode='w') as h5:
+        h5.create_packed('/arrays', arrays)
+    created = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with open_h5file(filename, mode='r') as h5:
+        packed = h5['/arrays']
+        for name in names:
+            packed[name]
+    looked_up = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with open_h5file(filename, mode='r') as h5:
+        h5['/arrays'].read_many(names)
+    batch = time.perf_counter() - t0
+    return created, looked_up, batch
+
+
+if __name__ == '__main__':
+    n_arrays = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    arrays = make_arrays(n_arrays)
+    names = random.sample(list(arrays), min(N_LOOKUPS, n_arrays))
+
+    fd, filename = tempfile.mkstemp(suffix='.h5')
+    os.close(fd)
+    try:
+        created, looked_up = one_node_per_array(filename, arrays, names)
+        print('one node per array: create %.3fs, %d lookups %.3fs, %.1f MB'
+              % (created, len(names), looked_up,
+                 os.path.getsize(filename) / 1e6))
+
+        created, looked_up, batch = packed_node(filename, arrays, names)
+        print('packed node:        create %.3fs, %d lookups %.3fs, %.1f MB'
+              % (created, len(names), looked_up,
+                 os.path.getsize(filename) / 1e6))
+        print('packed read_many:   %d arrays %.3fs' % (len(names), batch))
+    finally:
+        os.remove(filename)
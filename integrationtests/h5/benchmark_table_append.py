@@ -0,0 +1,67 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+# Measure the append throughput of H5TableNode for column dicts and
+# structured arrays.
+#
+# Usage: python benchmark_table_append.py [n_rows] [n_appends]
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from apptools.io.h5.utils import open_h5file
+
+
+DESCRIPTION = [('time', 'f8'), ('channel', 'i4'), ('value', 'f4')]
+
+
+def benchmark(make_data, n_rows, n_appends):
+    fd, filename = tempfile.mkstemp(suffix='.h5')
+    os.close(fd)
+    try:
+        with open_h5file(filename, mode='w') as h5:
+            table = h5.create_table('/table', DESCRIPTION)
+            data = make_data(n_rows)
+            t0 = time.perf_counter()
+            for _ in range(n_appends):
+                table.append(data)
+            table._h5_table.flush()
+            return n_rows * n_appends / (time.perf_counter() - t0)
+    finally:
+        os.remove(filename)
+
+
+def make_columns(n_rows):
+    return {
+        'time': np.arange(n_rows, dtype='f8'),
+        'channel': np.arange(n_rows, dtype='i4') % 16,
+        'value': np.random.random(n_rows).astype('f4'),
+    }
+
+
+def make_records(n_rows):
+    records = np.empty(n_rows, dtype=DESCRIPTION)
+    for name, values in make_columns(n_rows).items():
+        records[name] = values
+    return records
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    n_appends = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    for label, make_data in [('dict', make_columns),
+                             ('structured', make_records)]:
+        rate = benchmark(make_data, n_rows, n_appends)
+        print('%-10s: %12.0f rows/s' % (label, rate))
@@ -0,0 +1,82 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+# Compare threads reading independent arrays through one H5File guarded by
+# a lock with threads reading through an H5ReaderPool.
+#
+# Usage: python benchmark_threaded_reads.py [n_threads] [n_rows]
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from apptools.io.h5.file import hdf5_is_threadsafe
+from apptools.io.h5.reader_pool import H5ReaderPool
+from apptools.io.h5.utils import open_h5file
+
+
+N_READS = 20
+BLOCK_ROWS = 10000
+
+
+def make_file(filename, n_arrays, n_rows):
+    with open_h5file(filename, mode='w') as h5:
+        for i in range(n_arrays):
+            data = np.random.random((n_rows, 16))
+            h5.create_array('/array%d' % i, data, chunked=True)
+
+
+def run(n_threads, n_arrays, n_rows, read):
+    def work(i):
+        node_path = '/array%d' % i
+        total = 0.0
+        for j in range(N_READS):
+            start = (j * BLOCK_ROWS) % (n_rows - BLOCK_ROWS)
+            total += read(node_path, slice(start, start + BLOCK_ROWS)).sum()
+        return total
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(n_threads) as executor:
+        list(executor.map(work, range(n_arrays)))
+    return time.perf_counter() - t0
+
+
+if __name__ == '__main__':
+    n_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 500000
+
+    fd, filename = tempfile.mkstemp(suffix='.h5')
+    os.close(fd)
+    try:
+        make_file(filename, n_threads, n_rows)
+        print('HDF5 thread-safe: %s' % hdf5_is_threadsafe())
+
+        with open_h5file(filename, mode='r') as h5:
+            lock = threading.Lock()
+
+            def locked_read(node_path, key):
+                with lock:
+                    return h5.read(node_path, key)
+
+            elapsed = run(1, n_threads, n_rows, locked_read)
+            print('1 thread, one handle:      %.3fs' % elapsed)
+            elapsed = run(n_threads, n_threads, n_rows, locked_read)
+            print('%d threads, locked handle: %.3fs' % (n_threads, elapsed))
+
+        with H5ReaderPool(filename) as pool:
+            elapsed = run(n_threads, n_threads, n_rows, pool.read)
+            print('%d threads, reader pool:   %.3fs' % (n_threads, elapsed))
+    finally:
+        os.remove(filename)
@@ -0,0 +1,72 @@
+# (C) Copyright 2005-2026 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+# Time `load_projects` against a sequential `load_project` loop on a batch of
+# generated project files.
+#
+# Usage: python benchmark_load_projects.py [n_projects] [n_objects]
+
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+from apptools.persistence.project_loader import load_project, load_projects
+
+
+class Foo:
+    """ A stand-in for the objects held by a real project. """
+
+    def __init__(self, i):
+        self.firstname = 'didier %d' % i
+        self.lastname = 'enfant'
+        self.values = list(range(20))
+
+
+def make_projects(directory, n_projects, n_objects):
+    filenames = []
+    for i in range(n_projects):
+        filename = os.path.join(directory, 'p%d.project' % i)
+        objects = [Foo(j) for j in range(n_objects)]
+        metadata = {'version': 1, 'objects': objects}
+        with open(filename, 'wb') as f:
+            pickle.dump(metadata, f)
+        filenames.append(filename)
+    return filenames
+
+
+if __name__ == '__main__':
+    n_projects = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_objects = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    directory = tempfile.mkdtemp()
+    try:
+        filenames = make_projects(directory, n_projects, n_objects)
+
+        t0 = time.perf_counter()
+        for filename in filenames:
+            load_project(filename, 'unused', 1, None)
+        elapsed = time.perf_counter() - t0
+        print('sequential:  %.3fs' % elapsed)
+
+        for workers in (1, 2, 4, os.cpu_count()):
+            t0 = time.perf_counter()
+            results = list(load_projects(
+                filenames, 'unused', 1, workers=workers
+            ))
+            elapsed = time.perf_counter() - t0
+            errors = sum(1 for r in results if r.error is not None)
+            print('workers=%-3d: %.3fs (%d errors)' % (
+                workers, elapsed, errors
+            ))
+    finally:
+        shutil.rmtree(directory)